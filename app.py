@@ -9,6 +9,15 @@ from config import Config
 from utils.database import LeadDatabase
 from utils.logger import setup_logger
 
+# Opções de exportação: rótulo -> (extensão, MIME type)
+EXPORT_OPTIONS = {
+    "Excel (.xlsx)": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "CSV (.csv)": (".csv", "text/csv"),
+    "JSON (.json)": (".json", "application/json"),
+    "JSON Lines (.jsonl)": (".jsonl", "application/x-ndjson"),
+    "Parquet (.parquet)": (".parquet", "application/vnd.apache.parquet"),
+}
+
 # Configurar página
 st.set_page_config(
     page_title="Captura de Leads - Google Maps",
@@ -106,7 +115,7 @@ def capture_leads_tab():
         
         export_format = st.selectbox(
             "Formato de Exportação",
-            ["Excel (.xlsx)", "CSV (.csv)", "JSON (.json)"]
+            list(EXPORT_OPTIONS.keys())
         )
         
         quality_filter = st.selectbox(
@@ -186,12 +195,13 @@ def execute_lead_capture(search_term, location, radius, max_results, export_form
             st.metric("📈 Taxa de Qualificação", f"{(leads_qualificados/leads_encontrados)*100:.1f}%")
         
         # Botão para download
-        filename = f"leads_{search_term}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+        extension, mime = EXPORT_OPTIONS.get(export_format, EXPORT_OPTIONS["Excel (.xlsx)"])
+        filename = f"leads_{search_term}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{extension}"
         st.download_button(
             label="📥 Baixar Arquivo de Leads",
             data=b"dados_simulados",  # Substituir pelos dados reais
             file_name=filename,
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            mime=mime
         )
         
     except Exception as e:
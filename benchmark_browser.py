@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark do navegador do scraping: perfil padrão x perfil enxuto (LEAN_BROWSER_PROFILE)
+"""
+
+import json
+import sys
+import time
+import argparse
+from pathlib import Path
+from urllib.parse import quote
+
+# Adicionar o diretório raiz ao path
+sys.path.append(str(Path(__file__).parent))
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from tools.webdriver_pool import create_chrome_driver
+
+
+def bytes_transferidos(driver) -> int:
+    """Soma os bytes recebidos pela rede desde a última leitura do log de desempenho"""
+    total = 0
+    for entry in driver.get_log('performance'):
+        message = json.loads(entry['message'])['message']
+        if message.get('method') == 'Network.loadingFinished':
+            total += int(message['params'].get('encodedDataLength', 0))
+    return total
+
+
+def medir(nome: str, lean: bool, url: str, repeticoes: int):
+    """Carrega a busca algumas vezes e retorna (bytes médios, tempo médio até a lista aparecer)"""
+    driver = create_chrome_driver(lean=lean, performance_log=True)
+    try:
+        tamanhos, tempos = [], []
+        for _ in range(repeticoes):
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+            bytes_transferidos(driver)  # descarta eventos anteriores
+
+            inicio = time.perf_counter()
+            driver.get(url)
+            WebDriverWait(driver, 30).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "div[role='feed']"))
+            )
+            tempos.append(time.perf_counter() - inicio)
+
+            time.sleep(1)  # deixa terminar as requisições disparadas após a lista
+            tamanhos.append(bytes_transferidos(driver))
+    finally:
+        driver.quit()
+
+    media_bytes = sum(tamanhos) / len(tamanhos)
+    media_tempo = sum(tempos) / len(tempos)
+    print(f"{nome:<16} {media_bytes / 1024:10.0f} KB {media_tempo:10.2f}s até a lista de resultados")
+    return media_bytes, media_tempo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do perfil enxuto do navegador")
+    parser.add_argument("--termo", default="restaurante", help="Termo de busca")
+    parser.add_argument("--localizacao", default="São Paulo, SP", help="Localização")
+    parser.add_argument("--repeticoes", "-n", type=int, default=3,
+                        help="Carregamentos por perfil")
+    args = parser.parse_args()
+
+    url = f"https://www.google.com/maps/search/{quote(f'{args.termo} {args.localizacao}')}"
+
+    print("🚀 Benchmark do navegador do scraping")
+    print("=" * 70)
+
+    bytes_padrao, tempo_padrao = medir("Perfil padrão", False, url, args.repeticoes)
+    bytes_enxuto, tempo_enxuto = medir("Perfil enxuto", True, url, args.repeticoes)
+
+    print("=" * 70)
+    print(f"📉 Bytes transferidos: {100 * (1 - bytes_enxuto / bytes_padrao):.0f}% a menos")
+    print(f"📈 Tempo até a lista: {tempo_padrao / tempo_enxuto:.1f}x mais rápido")
+
+
+if __name__ == "__main__":
+    main()
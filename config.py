@@ -22,10 +22,59 @@ class Config:
     
     # Configurações do Google Maps API
     GOOGLE_MAPS_API_KEY = os.getenv("GOOGLE_MAPS_API_KEY", "")
+    PLACES_QPS = float(os.getenv("PLACES_QPS", "10"))  # requisições por segundo à API
+    PLACES_DETAILS_WORKERS = int(os.getenv("PLACES_DETAILS_WORKERS", "8"))
+    NEXT_PAGE_TOKEN_DELAY = float(os.getenv("NEXT_PAGE_TOKEN_DELAY", "2"))  # ativação do next_page_token
+    # Erros da API: novas tentativas com backoff exponencial, taxa mínima após
+    # erros de cota e disjuntor que passa as buscas ao scraping
+    API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "4"))
+    API_BACKOFF_BASE = float(os.getenv("API_BACKOFF_BASE", "0.5"))  # segundos
+    API_BACKOFF_MAX = float(os.getenv("API_BACKOFF_MAX", "30"))  # segundos
+    # Prazo das novas tentativas internas do cliente googlemaps; quase zero
+    # para que só _call_api repita (0 recusaria a primeira tentativa)
+    API_RETRY_TIMEOUT = float(os.getenv("API_RETRY_TIMEOUT", "0.05"))
+    PLACES_MIN_QPS = float(os.getenv("PLACES_MIN_QPS", "1"))
+    API_CIRCUIT_FAILURES = int(os.getenv("API_CIRCUIT_FAILURES", "5"))  # falhas seguidas que abrem o circuito
+    API_CIRCUIT_RESET = float(os.getenv("API_CIRCUIT_RESET", "60"))  # segundos até testar a API de novo
+    # Campos pedidos à Place Details: minimal (nome, endereço), contact (+ telefone, site)
+    # ou full (+ avaliações, horários, fotos)
+    PLACE_DETAILS_PROFILE = os.getenv("PLACE_DETAILS_PROFILE", "full").lower()
+    PLACE_DETAILS_LAZY = os.getenv("PLACE_DETAILS_LAZY", "True").lower() == "true"  # demais campos sob demanda
+    # Busca em subáreas (raios grandes)
+    TILED_SEARCH_MIN_RADIUS = int(os.getenv("TILED_SEARCH_MIN_RADIUS", "20000"))  # acima disso, divide a área
+    TILE_MIN_RADIUS = int(os.getenv("TILE_MIN_RADIUS", "500"))  # menor subárea, em metros
+    TILE_SEARCH_WORKERS = int(os.getenv("TILE_SEARCH_WORKERS", "4"))
+    
+    # Cache persistente de respostas da API (compartilhado entre processos)
+    CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", "leads.db")
+    GEOCODE_CACHE_TTL = int(os.getenv("GEOCODE_CACHE_TTL", str(30 * 24 * 3600)))  # segundos
+    GEOCODE_CACHE_MAX_ENTRIES = int(os.getenv("GEOCODE_CACHE_MAX_ENTRIES", "1000"))
+    # Validade (segundos) dos detalhes de estabelecimentos, por grupo de campos
+    PLACE_CACHE_TTL_BASICO = int(os.getenv("PLACE_CACHE_TTL_BASICO", str(30 * 24 * 3600)))  # nome, endereço, geometria
+    PLACE_CACHE_TTL_CONTATO = int(os.getenv("PLACE_CACHE_TTL_CONTATO", str(7 * 24 * 3600)))  # telefone, site
+    PLACE_CACHE_TTL_DINAMICO = int(os.getenv("PLACE_CACHE_TTL_DINAMICO", str(24 * 3600)))  # horários, avaliações, fotos
+    PLACE_CACHE_MAX_ENTRIES = int(os.getenv("PLACE_CACHE_MAX_ENTRIES", "200000"))
     
     # Configurações do Selenium
     CHROME_DRIVER_PATH = os.getenv("CHROME_DRIVER_PATH", "/usr/bin/chromedriver")
     HEADLESS_MODE = os.getenv("HEADLESS_MODE", "True").lower() == "true"
+    WEBDRIVER_POOL_SIZE = int(os.getenv("WEBDRIVER_POOL_SIZE", "2"))  # navegadores reaproveitados
+    WEBDRIVER_MAX_USES = int(os.getenv("WEBDRIVER_MAX_USES", "50"))  # usos antes de reciclar
+    WEBDRIVER_MAX_AGE = int(os.getenv("WEBDRIVER_MAX_AGE", "1800"))  # segundos antes de reciclar
+    WEBDRIVER_PREWARM = os.getenv("WEBDRIVER_PREWARM", "True").lower() == "true"
+    # Perfil enxuto: não baixa imagens, fontes, mídia nem tiles do mapa
+    LEAN_BROWSER_PROFILE = os.getenv("LEAN_BROWSER_PROFILE", "True").lower() == "true"
+    # "feed": lê todos os cartões da lista de uma vez; "click": abre cada resultado;
+    # "network": decodifica as respostas de busca capturadas via DevTools
+    SCRAPING_EXTRACTION_MODE = os.getenv("SCRAPING_EXTRACTION_MODE", "feed").lower()
+    # Campos buscados na página de detalhes quando o cartão não os traz
+    # (cada um custa um carregamento de página por lead; vazio: só o cartão)
+    SCRAPING_DETAIL_FIELDS = [f.strip() for f in os.getenv("SCRAPING_DETAIL_FIELDS", "").split(",") if f.strip()]
+    # Limites da rolagem da lista de resultados
+    SCROLL_MAX_WAIT = float(os.getenv("SCROLL_MAX_WAIT", "10"))  # espera máxima por rolagem (s)
+    SCROLL_IDLE_MS = int(os.getenv("SCROLL_IDLE_MS", "500"))  # página sem atividade = pronta
+    SCROLL_MAX_SCROLLS = int(os.getenv("SCROLL_MAX_SCROLLS", "100"))
+    SCROLL_MAX_TIMEOUTS = int(os.getenv("SCROLL_MAX_TIMEOUTS", "2"))  # rolagens seguidas sem novidades
     
     # Configurações do banco de dados
     DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///leads.db")
@@ -34,6 +83,7 @@ class Config:
     DEBUG = os.getenv("DEBUG", "True").lower() == "true"
     MAX_RESULTS_PER_SEARCH = int(os.getenv("MAX_RESULTS_PER_SEARCH", "50"))
     SEARCH_DELAY = int(os.getenv("SEARCH_DELAY", "2"))
+    SCRAPING_WORKERS = int(os.getenv("SCRAPING_WORKERS", str(min(4, os.cpu_count() or 1))))  # processos de scraping
     
     # Configurações específicas para leads
     DEFAULT_SEARCH_RADIUS = 10000  # 10km em metros
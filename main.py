@@ -12,6 +12,7 @@ from config import Config
 from crew.lead_capture_crew import LeadCaptureCrew
 from utils.logger import setup_logger
 from utils.database import init_database
+from utils.exporters import detect_format
 
 def main():
     """Função principal do sistema de captura de leads"""
@@ -31,7 +32,8 @@ def main():
                        help="Número máximo de resultados")
     parser.add_argument("--arquivo-saida", "-o", type=str, 
                        default=f"leads_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                       help="Arquivo de saída para os leads")
+                       help="Arquivo de saída para os leads (.xlsx, .csv, .json, .jsonl ou .parquet; "
+                            "sufixo .gz/.zst para compressão)")
     
     args = parser.parse_args()
     
@@ -41,6 +43,7 @@ def main():
     try:
         # Validar configurações
         Config.validate()
+        detect_format(args.arquivo_saida)
         logger.info("Configurações validadas com sucesso")
         
         # Inicializar banco de dados
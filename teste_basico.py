@@ -73,8 +73,11 @@ def test_database():
         if leads:
             print(f"✅ Lead recuperado: {leads[0]['nome']}")
         
-        # Limpar banco de teste
-        os.remove("test_leads.db")
+        # Limpar banco de teste (incluindo arquivos do modo WAL)
+        db.close()
+        for sufixo in ("", "-wal", "-shm"):
+            if os.path.exists("test_leads.db" + sufixo):
+                os.remove("test_leads.db" + sufixo)
         print("✅ Banco de dados testado com sucesso")
         
         return True
@@ -83,6 +86,325 @@ def test_database():
         print(f"❌ Erro no teste do banco: {e}")
         return False
 
+def test_save_leads_batch():
+    """Testa a gravação em lote com deduplicação e a associação dos IDs à entrada"""
+    print("\n🧪 Testando gravação de leads em lote...")
+    
+    banco = "test_lote.db"
+    try:
+        from utils.database import LeadDatabase
+        
+        with LeadDatabase(banco) as db:
+            id_place = db.save_lead({'nome': 'Place 1', 'place_id': 'P1'})
+            id_contato = db.save_lead({'nome': 'Contato', 'telefone': '(11) 1111-2222'})
+            
+            # Lote gravado de uma vez (executemany): place_id, chave de
+            # contato, sem chave, repetidos no próprio lote e um lead inválido
+            lote = [
+                {'nome': 'Sem chave 1'},
+                {'nome': 'Place 1 atualizado', 'place_id': 'P1'},
+                {'nome': 'Contato atualizado', 'telefone': '+55 11 1111-2222'},
+                {'nome': 'Sem chave 2'},
+                {'nome': 'Place 2', 'place_id': 'P2'},
+                {'nome': 'Place 2 repetido', 'place_id': 'P2'},
+                {'nome': 'Contato novo', 'website': 'https://www.novo.com.br/'},
+                'não é um lead',
+                {'nome': 'Sem chave 3'},
+            ]
+            resultado = db.save_leads(lote)
+            nomes = {lead['id']: lead['nome'] for lead in db.get_leads()}
+            ids = resultado['ids']
+            
+            assert [f['indice'] for f in resultado['falhas']] == [7]
+            assert ids[1] == id_place and ids[2] == id_contato
+            assert ids[4] == ids[5]
+            esperados = ['Sem chave 1', 'Place 1 atualizado', 'Contato atualizado', 'Sem chave 2',
+                         'Place 2 repetido', 'Place 2 repetido', 'Contato novo', 'Sem chave 3']
+            assert [nomes[i] for i in ids] == esperados, [nomes[i] for i in ids]
+            assert len(nomes) == 7
+            
+            # Lote com uma linha rejeitada pelo banco: gravado linha a linha
+            resultado = db.save_leads([
+                {'nome': 'Sem chave 4'},
+                {'nome': None, 'telefone': '(11) 5555-6666'},
+                {'nome': 'Place 1 de novo', 'place_id': 'P1'},
+                {'nome': 'Contato novo atualizado', 'website': 'novo.com.br'},
+            ])
+            nomes = {lead['id']: lead['nome'] for lead in db.get_leads()}
+            ids = resultado['ids']
+            
+            assert [f['indice'] for f in resultado['falhas']] == [1]
+            assert [nomes[i] for i in ids] == ['Sem chave 4', 'Place 1 de novo', 'Contato novo atualizado']
+            assert ids[1] == id_place and len(nomes) == 8
+        
+        print("✅ IDs do lote associados corretamente, inclusive com repetidos e falhas")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro no teste de gravação em lote: {e!r}")
+        return False
+    finally:
+        for sufixo in ("", "-wal", "-shm"):
+            if os.path.exists(banco + sufixo):
+                os.remove(banco + sufixo)
+
+def test_contact_key_migration():
+    """Testa a migração de um banco da versão anterior à deduplicação por contato"""
+    print("\n🧪 Testando migração da chave de contato...")
+    
+    banco = "test_migracao.db"
+    try:
+        import sqlite3
+        from utils.database import LeadDatabase
+        
+        # Banco no formato original, com leads repetidos por telefone e website
+        conn = sqlite3.connect(banco)
+        conn.executescript('''
+            CREATE TABLE leads (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                nome TEXT NOT NULL, endereco TEXT, telefone TEXT, email TEXT, website TEXT,
+                categoria TEXT, avaliacao REAL, numero_avaliacoes INTEGER,
+                horario_funcionamento TEXT, latitude REAL, longitude REAL,
+                termo_busca TEXT, localizacao_busca TEXT,
+                data_captura TIMESTAMP DEFAULT CURRENT_TIMESTAMP, observacoes TEXT
+            );
+            CREATE TABLE campanhas (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, nome TEXT NOT NULL, termo_busca TEXT,
+                localizacao TEXT, data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                status TEXT DEFAULT 'ativa'
+            );
+        ''')
+        conn.executemany("INSERT INTO leads (nome, telefone, website) VALUES (?, ?, ?)", [
+            ('Padaria antiga', '(11) 3333-4444', ''),
+            ('Padaria recente', '11 3333-4444', ''),
+            ('Loja antiga', '', 'www.loja.com.br'),
+            ('Loja recente', '', 'https://loja.com.br/'),
+            ('Sem contato', '', ''),
+        ])
+        conn.commit()
+        conn.close()
+        
+        with LeadDatabase(banco) as db:
+            cursor = db.connections.get_connection().cursor()
+            cursor.execute("SELECT id, chave_contato FROM leads ORDER BY id")
+            chaves = dict(cursor.fetchall())
+            # Só o lead mais recente de cada chave a recebe
+            assert chaves == {1: None, 2: 'tel:1133334444', 3: None, 4: 'web:loja.com.br', 5: None}, chaves
+            
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'idx_leads_chave_contato'")
+            assert cursor.fetchone(), "índice único da chave de contato não foi criado"
+            cursor.close()
+            
+            # Nova captura do mesmo estabelecimento atualiza o lead existente
+            assert db.save_lead({'nome': 'Padaria atualizada', 'telefone': '+55 (11) 3333-4444'}) == 2
+            assert db.save_lead({'nome': 'Loja atualizada', 'website': 'http://www.loja.com.br'}) == 4
+            assert len(db.get_leads()) == 5
+        
+        print("✅ Leads antigos migrados sem duplicação nas novas capturas")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro no teste de migração: {e!r}")
+        return False
+    finally:
+        for sufixo in ("", "-wal", "-shm"):
+            if os.path.exists(banco + sufixo):
+                os.remove(banco + sufixo)
+
+def test_maps_payload_parser():
+    """Testa o parser de respostas de busca do Google Maps com um payload salvo"""
+    print("\n🧪 Testando parser de respostas do Google Maps...")
+    
+    try:
+        from tools.maps_payload_parser import parse_search_response
+        
+        fixture = Path(__file__).parent / "fixtures" / "maps_search_response.txt"
+        businesses = parse_search_response(fixture.read_text(encoding="utf-8"))
+        
+        assert len(businesses) == 3, f"esperados 3 estabelecimentos, obtidos {len(businesses)}"
+        assert businesses[0]['nome'] == 'Padaria Pão Dourado'
+        assert businesses[0]['telefone'] == '(11) 3333-4444'
+        assert businesses[0]['avaliacao'] == 4.6
+        assert businesses[1]['website'] == ''
+        assert businesses[2]['numero_avaliacoes'] == 0
+        assert parse_search_response("resposta inválida") == []
+        
+        print(f"✅ {len(businesses)} estabelecimentos extraídos do payload de exemplo")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro no teste do parser: {e}")
+        return False
+
+def test_feed_scraping():
+    """Testa que o modo feed não abre páginas de detalhes quando o cartão já traz os campos"""
+    print("\n🧪 Testando extração pelos cartões da lista...")
+    
+    try:
+        from config import Config
+        from tools.google_maps_tool import FEED_CARDS_JS, GoogleMapsSearchTool
+        
+        class Janelas:
+            def __init__(self):
+                self.abertas = []
+            
+            def new_window(self, tipo):
+                self.abertas.append(tipo)
+            
+            def window(self, handle):
+                pass
+        
+        class NavegadorFalso:
+            """Página de resultados com um único cartão completo"""
+            current_window_handle = 'resultados'
+            
+            def __init__(self):
+                self.switch_to = Janelas()
+                self.paginas = []
+            
+            def get(self, url):
+                self.paginas.append(url)
+            
+            def find_element(self, *args):
+                return 'feed'
+            
+            def set_script_timeout(self, segundos):
+                pass
+            
+            def execute_async_script(self, script, *args):
+                return 'fim'  # fim da lista de resultados
+            
+            def execute_script(self, script, feed, inicio=None):
+                if script != FEED_CARDS_JS:
+                    return None  # instalação dos observadores de rolagem
+                cartoes = [{
+                    'nome': 'Padaria Pão Dourado',
+                    'url': 'https://www.google.com/maps/place/x/data=!19sChIJteste',
+                    'avaliacao': '4,6',
+                    'numero_avaliacoes': '(1.234)',
+                    'website': 'https://www.google.com/url?q=https://paodourado.com.br/&sa=U',
+                    'linhas': ['4,6', 'Padaria · R. Augusta, 1500', 'Aberto · (11) 3333-4444'],
+                }]
+                return cartoes[inicio:]
+        
+        campos_originais = Config.SCRAPING_DETAIL_FIELDS
+        Config.SCRAPING_DETAIL_FIELDS = ['telefone', 'website']
+        try:
+            ferramenta = GoogleMapsSearchTool.model_construct()
+            navegador = NavegadorFalso()
+            object.__setattr__(ferramenta, 'driver', navegador)
+            leads = ferramenta._scrape_feed('padaria', 'São Paulo, SP', 1)
+        finally:
+            Config.SCRAPING_DETAIL_FIELDS = campos_originais
+        
+        assert len(leads) == 1
+        assert leads[0]['telefone'] == '(11) 3333-4444'
+        assert leads[0]['website'] == 'https://paodourado.com.br/'
+        assert leads[0]['numero_avaliacoes'] == 1234
+        assert navegador.switch_to.abertas == [], "cartão completo não deve abrir aba de detalhes"
+        assert len(navegador.paginas) == 1, "apenas a página de busca deve ser carregada"
+        
+        print("✅ Cartão completo extraído sem abrir a página do estabelecimento")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro no teste de extração pelos cartões: {e!r}")
+        return False
+
+def test_resilience():
+    """Testa novas tentativas, disjuntor e redução da taxa após erros de cota"""
+    print("\n🧪 Testando tratamento de erros da API...")
+    
+    try:
+        import time
+        import googlemaps
+        from config import Config
+        from utils.resilience import CircuitBreaker, CircuitOpenError, call_with_retry
+        from tools import google_maps_tool
+        
+        # Erro transitório é repetido; erro de uso não
+        tentativas = []
+        def instavel():
+            tentativas.append(1)
+            if len(tentativas) < 3:
+                raise TimeoutError()
+            return "ok"
+        assert call_with_retry(instavel, retries=3, base_delay=0.001) == "ok"
+        assert len(tentativas) == 3
+        
+        tentativas.clear()
+        def invalida():
+            tentativas.append(1)
+            raise ValueError()
+        try:
+            call_with_retry(invalida, retries=3, base_delay=0.001,
+                            is_retryable=lambda e: isinstance(e, TimeoutError))
+            assert False, "ValueError deveria ser propagado"
+        except ValueError:
+            assert len(tentativas) == 1
+        
+        # Disjuntor: abre após o limite, libera uma chamada de teste depois do
+        # reset_timeout e ignora erros que não são de indisponibilidade
+        def falha():
+            raise TimeoutError()
+        def erro_de_uso():
+            raise ValueError()
+        disjuntor = CircuitBreaker(failure_threshold=2, reset_timeout=0.05,
+                                   is_failure=lambda e: isinstance(e, TimeoutError))
+        for _ in range(2):
+            try:
+                disjuntor.call(falha)
+            except TimeoutError:
+                pass
+        assert disjuntor.state == CircuitBreaker.OPEN
+        try:
+            disjuntor.call(lambda: "ok")
+            assert False, "o circuito aberto deveria recusar a chamada"
+        except CircuitOpenError:
+            pass
+        
+        time.sleep(0.06)
+        assert disjuntor.state == CircuitBreaker.HALF_OPEN
+        try:
+            disjuntor.call(erro_de_uso)
+        except ValueError:
+            pass
+        assert disjuntor.state == CircuitBreaker.HALF_OPEN, "erro de uso não deve fechar o circuito"
+        try:
+            disjuntor.call(falha)
+        except TimeoutError:
+            pass
+        assert disjuntor.state == CircuitBreaker.OPEN, "falha na chamada de teste deve reabrir"
+        
+        time.sleep(0.06)
+        assert disjuntor.call(lambda: "ok") == "ok"
+        assert disjuntor.state == CircuitBreaker.CLOSED
+        
+        # Erro de cota corta a taxa pela metade, até PLACES_MIN_QPS, e ela volta aos poucos
+        limitador = google_maps_tool.places_rate_limiter
+        taxa_original = limitador.rate
+        try:
+            limitador.set_rate(Config.PLACES_QPS)
+            cota = googlemaps.exceptions.ApiError("OVER_QUERY_LIMIT")
+            assert google_maps_tool.is_retryable_api_error(cota)
+            assert not google_maps_tool.is_retryable_api_error(googlemaps.exceptions.ApiError("INVALID_REQUEST"))
+            google_maps_tool._slow_down_on_quota(cota, 0)
+            assert limitador.rate == max(Config.PLACES_MIN_QPS, Config.PLACES_QPS / 2)
+            for _ in range(20):
+                google_maps_tool._slow_down_on_quota(cota, 0)
+            assert limitador.rate == Config.PLACES_MIN_QPS
+            google_maps_tool._recover_rate()
+            assert Config.PLACES_MIN_QPS < limitador.rate <= Config.PLACES_QPS
+        finally:
+            limitador.set_rate(taxa_original)
+        
+        print("✅ Novas tentativas, disjuntor e redução da taxa funcionando")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro no teste de tratamento de erros: {e!r}")
+        return False
+
 def test_config():
     """Testa a configuração"""
     print("\n🧪 Testando configuração...")
@@ -120,6 +442,11 @@ def main():
     
     testes_passaram.append(test_imports())
     testes_passaram.append(test_database())
+    testes_passaram.append(test_save_leads_batch())
+    testes_passaram.append(test_contact_key_migration())
+    testes_passaram.append(test_maps_payload_parser())
+    testes_passaram.append(test_feed_scraping())
+    testes_passaram.append(test_resilience())
     testes_passaram.append(test_config())
     
     print("\n" + "=" * 50)
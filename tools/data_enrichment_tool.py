@@ -6,6 +6,7 @@ from typing import Dict, List, Optional
 import time
 from urllib.parse import urljoin, urlparse
 from config import Config
+from utils.database import LeadWriteBehindQueue
 
 class DataEnrichmentTool(BaseTool):
     """Ferramenta para enriquecer dados de leads com informações adicionais"""
@@ -13,11 +14,13 @@ class DataEnrichmentTool(BaseTool):
     name: str = "DataEnrichment"
     description: str = "Ferramenta para enriquecer dados de leads com informações de contato e detalhes adicionais"
     
-    def __init__(self):
+    def __init__(self, lead_writer: Optional[LeadWriteBehindQueue] = None):
         super().__init__(
             name=self.name,
             description=self.description
         )
+        # Fila opcional de gravação em segundo plano dos leads enriquecidos
+        self.lead_writer = lead_writer
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
@@ -33,12 +36,16 @@ class DataEnrichmentTool(BaseTool):
         Returns:
             Dados enriquecidos do lead
         """
-        enriched_data = lead_data.copy()
+        # Só as chaves usadas aqui são lidas: num lead preguiçoso (LazyBusiness)
+        # cada leitura busca apenas o grupo de campos da chave, e a cópia
+        # leva os campos já carregados, sem disparar novas consultas
+        website = lead_data.get('website')
+        enriched_data = dict(lead_data)
         
         try:
             # Enriquecer com informações do website
-            if lead_data.get('website'):
-                website_info = self._extract_website_info(lead_data['website'])
+            if website:
+                website_info = self._extract_website_info(website)
                 enriched_data.update(website_info)
             
             # Buscar informações adicionais por nome e localização
@@ -52,6 +59,9 @@ class DataEnrichmentTool(BaseTool):
             # Validar e limpar dados
             enriched_data = self._validate_and_clean_data(enriched_data)
             
+            if self.lead_writer:
+                self.lead_writer.submit(enriched_data)
+            
             return enriched_data
             
         except Exception as e:
@@ -0,0 +1,130 @@
+import time
+from typing import Dict, Optional
+from config import Config
+
+# Instala na página um MutationObserver sobre a lista de resultados e um
+# PerformanceObserver de recursos de rede; ambos marcam o instante da última
+# atividade, usado para decidir quando a página "assentou"
+_INSTALL_JS = """
+const feed = arguments[0];
+if (window.__feedScroll && window.__feedScroll.feed === feed) return;
+if (window.__feedScroll) {
+    window.__feedScroll.mutations.disconnect();
+    window.__feedScroll.network.disconnect();
+}
+const state = {feed: feed, lastActivity: performance.now(), added: 0};
+state.mutations = new MutationObserver(records => {
+    for (const record of records) {
+        if (record.target === feed) state.added += record.addedNodes.length;
+    }
+    state.lastActivity = performance.now();
+});
+state.mutations.observe(feed, {childList: true, subtree: true});
+state.network = new PerformanceObserver(() => { state.lastActivity = performance.now(); });
+state.network.observe({type: 'resource', buffered: false});
+window.__feedScroll = state;
+"""
+
+# Rola até o fim e espera (assíncrono) até: a lista crescer e a página ficar
+# ociosa por idleMs, o marcador de fim de lista aparecer, ou maxWait expirar
+_SCROLL_AND_WAIT_JS = """
+const feed = arguments[0];
+const maxWait = arguments[1];
+const idleMs = arguments[2];
+const done = arguments[arguments.length - 1];
+const state = window.__feedScroll;
+const before = state.added;
+const start = performance.now();
+
+function atEnd() {
+    if (feed.querySelector('.HlvSq')) return true;
+    const last = feed.lastElementChild;
+    return !!last && /chegou ao final da lista|end of the list/i.test(last.innerText || '');
+}
+
+feed.scrollTop = feed.scrollHeight;
+
+(function check() {
+    const now = performance.now();
+    const grew = state.added > before;
+    if (atEnd()) return done('fim');
+    if (grew && now - state.lastActivity >= idleMs) return done('novos');
+    if (now - start >= maxWait) return done(grew ? 'novos' : 'timeout');
+    setTimeout(check, 50);
+})();
+"""
+
+
+class FeedScroller:
+    """
+    Rolagem da lista de resultados do Google Maps guiada por eventos da página
+
+    Em vez de pausas fixas, cada rolagem espera até que novos cartões sejam
+    inseridos na lista (MutationObserver) e a rede fique ociosa, ou até o
+    marcador de fim de lista. Limites configuráveis evitam esperas infinitas,
+    e o tempo gasto esperando versus processando fica registrado em stats().
+    """
+
+    def __init__(self, driver, feed, max_wait: Optional[float] = None, idle_ms: Optional[int] = None,
+                 max_scrolls: Optional[int] = None, max_timeouts: Optional[int] = None):
+        """
+        Args:
+            driver: WebDriver com a página de resultados aberta
+            feed: Elemento div[role='feed'] da lista
+            max_wait: Espera máxima por rolagem, em segundos
+            idle_ms: Tempo sem atividade na página para considerá-la pronta
+            max_scrolls: Máximo de rolagens
+            max_timeouts: Rolagens seguidas sem novos resultados antes de desistir
+        """
+        self.driver = driver
+        self.feed = feed
+        self.max_wait = max_wait if max_wait is not None else Config.SCROLL_MAX_WAIT
+        self.idle_ms = idle_ms if idle_ms is not None else Config.SCROLL_IDLE_MS
+        self.max_scrolls = max_scrolls if max_scrolls is not None else Config.SCROLL_MAX_SCROLLS
+        self.max_timeouts = max_timeouts if max_timeouts is not None else Config.SCROLL_MAX_TIMEOUTS
+
+        self.scrolls = 0
+        self.wait_time = 0.0
+        self.last_status: Optional[str] = None
+        self._timeouts = 0
+        self._started = time.monotonic()
+
+        self.driver.set_script_timeout(self.max_wait + 5)
+        self.driver.execute_script(_INSTALL_JS, self.feed)
+
+    def scroll(self) -> bool:
+        """
+        Rola a lista e espera pelos próximos resultados
+
+        Returns:
+            True se ainda pode haver mais resultados, False ao chegar ao fim
+            da lista ou a um dos limites
+        """
+        if self.scrolls >= self.max_scrolls:
+            self.last_status = 'limite'
+            return False
+
+        started = time.monotonic()
+        status = self.driver.execute_async_script(
+            _SCROLL_AND_WAIT_JS, self.feed, self.max_wait * 1000, self.idle_ms
+        )
+        self.wait_time += time.monotonic() - started
+        self.scrolls += 1
+        self.last_status = status
+
+        if status == 'timeout':
+            self._timeouts += 1
+            return self._timeouts < self.max_timeouts
+        self._timeouts = 0
+        return status == 'novos'
+
+    def stats(self) -> Dict:
+        """Rolagens feitas, tempo esperando a página e tempo processando resultados"""
+        total = time.monotonic() - self._started
+        return {
+            'rolagens': self.scrolls,
+            'tempo_espera': round(self.wait_time, 2),
+            'tempo_trabalho': round(max(0.0, total - self.wait_time), 2),
+            'tempo_total': round(total, 2),
+            'motivo_parada': self.last_status,
+        }
@@ -1,15 +1,405 @@
 from crewai.tools import BaseTool
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import googlemaps
+import copy
 import time
 import json
-from typing import List, Dict, Optional
+import math
+import re
+import threading
+import numpy as np
+from urllib.parse import parse_qs, quote, urlparse
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Iterator, List, Dict, Optional, Tuple
 from config import Config
+from utils.cache import PersistentCache, normalize_key
+from utils.database import EARTH_RADIUS_M, LeadWriteBehindQueue, haversine_m
+from utils.rate_limiter import TokenBucket
+from utils.resilience import CircuitBreaker, CircuitOpenError, call_with_retry
+from tools.feed_scroller import FeedScroller
+from tools.maps_network_capture import SearchResponseCapture
+from tools.maps_payload_parser import parse_search_response
+from tools.webdriver_pool import apply_lean_profile, create_chrome_driver, get_driver_pool
+
+# Campos solicitados à Place Details API, agrupados pela frequência com que mudam
+PLACE_DETAILS_FIELD_GROUPS = {
+    'basico': ['name', 'formatted_address', 'geometry', 'types'],
+    'contato': ['formatted_phone_number', 'website'],
+    'dinamico': ['rating', 'user_ratings_total', 'opening_hours', 'photos'],
+}
+PLACE_DETAILS_FIELDS = [field for fields in PLACE_DETAILS_FIELD_GROUPS.values() for field in fields]
+
+# Chaves do lead preenchidas por cada grupo de campos
+LEAD_KEYS_BY_GROUP = {
+    'basico': ['nome', 'endereco', 'categoria', 'latitude', 'longitude'],
+    'contato': ['telefone', 'website'],
+    'dinamico': ['avaliacao', 'numero_avaliacoes', 'horario_funcionamento', 'fotos'],
+}
+
+# Perfis de campos pedidos à Place Details API: cada campanha pede só o que usa
+PLACE_DETAILS_PROFILES = {
+    'minimal': ['basico'],
+    'contact': ['basico', 'contato'],
+    'full': ['basico', 'contato', 'dinamico'],
+}
+
+# Limitador compartilhado por todas as instâncias da ferramenta: a cota da
+# API é por chave, não por objeto
+places_rate_limiter = TokenBucket(Config.PLACES_QPS)
+
+# Status da API que indicam problema passageiro do serviço (vale repetir)
+RETRYABLE_API_STATUSES = {'OVER_QUERY_LIMIT', 'UNKNOWN_ERROR'}
+
+
+def is_retryable_api_error(error: Exception) -> bool:
+    """Diz se um erro do googlemaps é transitório: cota, erro interno, HTTP 5xx/429, rede ou timeout"""
+    if isinstance(error, googlemaps.exceptions.ApiError):
+        return error.status in RETRYABLE_API_STATUSES
+    if isinstance(error, googlemaps.exceptions.HTTPError):
+        return error.status_code == 429 or error.status_code >= 500
+    return isinstance(error, (googlemaps.exceptions.Timeout, googlemaps.exceptions.TransportError))
+
+
+def is_quota_error(error: Exception) -> bool:
+    """Diz se o erro é de cota excedida (resposta da API que pede menos requisições)"""
+    if isinstance(error, googlemaps.exceptions.ApiError):
+        return error.status == 'OVER_QUERY_LIMIT'
+    return isinstance(error, googlemaps.exceptions.HTTPError) and error.status_code == 429
+
+
+# Disjuntor compartilhado: com a API fora do ar, as buscas passam direto
+# para o scraping em vez de esperar timeouts a cada chamada
+places_circuit_breaker = CircuitBreaker(
+    failure_threshold=Config.API_CIRCUIT_FAILURES,
+    reset_timeout=Config.API_CIRCUIT_RESET,
+    is_failure=is_retryable_api_error
+)
+
+
+def _slow_down_on_quota(error: Exception, attempt: int):
+    """Antes de repetir uma chamada: corta a taxa pela metade se o erro foi de cota"""
+    if is_quota_error(error):
+        rate = max(Config.PLACES_MIN_QPS, places_rate_limiter.rate / 2)
+        if rate < places_rate_limiter.rate:
+            places_rate_limiter.set_rate(rate)
+            print(f"⚠️  Cota da API excedida; reduzindo para {rate:.2f} requisições/s")
+    else:
+        print(f"⚠️  Erro transitório da API ({type(error).__name__}: {error}); "
+              f"nova tentativa {attempt + 1}/{Config.API_MAX_RETRIES}")
+
+
+def _recover_rate():
+    """Após uma chamada bem-sucedida, devolve a taxa aos poucos até Config.PLACES_QPS"""
+    if places_rate_limiter.rate < Config.PLACES_QPS:
+        places_rate_limiter.set_rate(min(Config.PLACES_QPS, places_rate_limiter.rate + Config.PLACES_QPS * 0.05))
+
+# Máximo de resultados que o places_nearby devolve para uma mesma busca
+# (3 páginas de 20); uma área que atinge esse limite tem mais lugares
+PLACES_NEARBY_CAP = 60
+
+# Maior raio aceito pelo places_nearby, em metros
+PLACES_NEARBY_MAX_RADIUS = 50000
+
+# Extrai de uma vez os cartões carregados na lista de resultados do Google
+# Maps, a partir do índice arguments[1]. Cada cartão traz nome, link, nota,
+# número de avaliações, o botão de website (quando existe) e as linhas de
+# texto (categoria · endereço, telefone).
+FEED_CARDS_JS = """
+const feed = arguments[0];
+const start = arguments[1] || 0;
+const links = feed.querySelectorAll("a[href*='/maps/place/']");
+const cards = [];
+for (let i = start; i < links.length; i++) {
+    const link = links[i];
+    const card = link.closest("div[jsaction]") || link.parentElement;
+    const ratingEl = card.querySelector("span[role='img'][aria-label]");
+    const rating = card.querySelector(".MW4etd");
+    const reviews = card.querySelector(".UY7F9");
+    const site = card.querySelector("a[data-value='Website'], a[data-value='Site'], a.lcr4fd");
+    const lines = Array.from(card.querySelectorAll(".W4Efsd"))
+        .filter(el => !el.querySelector(".W4Efsd"))
+        .map(el => el.innerText.trim())
+        .filter(text => text);
+    cards.push({
+        nome: link.getAttribute("aria-label") || "",
+        url: link.href,
+        avaliacao: rating ? rating.innerText : "",
+        numero_avaliacoes: reviews ? reviews.innerText : "",
+        rotulo_avaliacao: ratingEl ? ratingEl.getAttribute("aria-label") : "",
+        website: site ? site.href : "",
+        linhas: lines
+    });
+}
+return cards;
+"""
+
+
+def offset_point(lat: float, lng: float, north_m: float, east_m: float) -> Tuple[float, float]:
+    """Desloca um ponto alguns metros para norte/leste (aproximação local)"""
+    dlat = math.degrees(north_m / EARTH_RADIUS_M)
+    cos_lat = max(math.cos(math.radians(lat)), 1e-12)
+    dlng = math.degrees(east_m / (EARTH_RADIUS_M * cos_lat))
+    return lat + dlat, lng + dlng
+
+
+def hex_tiles(lat: float, lng: float, radius: float, tile_radius: float) -> List[Tuple[float, float]]:
+    """
+    Centros de círculos de raio tile_radius, em grade hexagonal, que cobrem o círculo dado
+    
+    Os círculos de uma grade hexagonal com espaçamento sqrt(3) * tile_radius
+    se sobrepõem o suficiente para não deixar buracos. Com tile_radius igual
+    à metade do raio, o resultado é o centro mais um anel de 6 círculos.
+    
+    Returns:
+        Lista de (lat, lng), do centro para a borda
+    """
+    col = math.sqrt(3) * tile_radius
+    row = 1.5 * tile_radius
+    # Células cujo hexágono não toca o círculo ficam de fora (com folga numérica)
+    limit = radius + tile_radius * (1 - 1e-9)
+    n_rows = int(math.ceil(limit / row))
+    n_cols = int(math.ceil(limit / col)) + 1
+    
+    offsets = []
+    for i in range(-n_rows, n_rows + 1):
+        y = i * row
+        shift = col / 2 if i % 2 else 0.0
+        for j in range(-n_cols, n_cols + 1):
+            x = j * col + shift
+            if math.hypot(x, y) < limit:
+                offsets.append((math.hypot(x, y), y, x))
+    
+    offsets.sort()
+    return [offset_point(lat, lng, y, x) for _, y, x in offsets]
+
+
+# Identificadores do estabelecimento no trecho data= dos links /maps/place/:
+# o place_id (!19sChIJ...) quando presente, senão o id interno (!1s0x...:0x...)
+_PLACE_URL_ID_PATTERNS = (
+    re.compile(r"!19s(ChIJ[\w-]+)"),
+    re.compile(r"!1s(0x[0-9a-f]+:0x[0-9a-f]+)", re.IGNORECASE),
+)
+
+
+def place_id_from_url(url: str) -> str:
+    """
+    Extrai o identificador do estabelecimento de um link /maps/place/ do Google Maps
+    
+    Returns:
+        place_id ou id interno do Maps; string vazia se o link não tiver nenhum
+    """
+    for pattern in _PLACE_URL_ID_PATTERNS:
+        match = pattern.search(url or "")
+        if match:
+            return match.group(1)
+    return ""
+
+
+# Função chamada antes de cada página de busca aberta pelo scraping; o
+# orquestrador multiprocesso a usa para impor um ritmo global entre workers
+scraping_throttle: Optional[Callable[[], None]] = None
+
+
+# Cache de geocodificação, criado no primeiro uso
+_geocode_cache: Optional[PersistentCache] = None
+
+
+def get_geocode_cache() -> PersistentCache:
+    """Retorna o cache persistente de geocodificação compartilhado"""
+    global _geocode_cache
+    if _geocode_cache is None:
+        _geocode_cache = PersistentCache(
+            "geocode",
+            db_path=Config.CACHE_DB_PATH,
+            ttl=Config.GEOCODE_CACHE_TTL,
+            max_entries=Config.GEOCODE_CACHE_MAX_ENTRIES
+        )
+    return _geocode_cache
+
+
+class PlaceDetailsCache:
+    """
+    Cache persistente de Place Details, por place_id e grupo de campos
+    
+    Cada grupo de PLACE_DETAILS_FIELD_GROUPS tem sua própria validade: dados
+    estáveis (nome, geometria) duram semanas, horários e avaliações um dia.
+    Quando só parte dos grupos expirou, apenas esses campos voltam à API.
+    """
+    
+    def __init__(self, cache: PersistentCache, ttls: Dict[str, float]):
+        self.cache = cache
+        self.ttls = ttls
+        self.hits = {group: 0 for group in PLACE_DETAILS_FIELD_GROUPS}
+        self.misses = {group: 0 for group in PLACE_DETAILS_FIELD_GROUPS}
+        self._lock = threading.Lock()
+    
+    def get(self, place_id: str, groups: Optional[List[str]] = None) -> Tuple[Dict, List[str]]:
+        """
+        Busca os detalhes guardados de um estabelecimento
+        
+        Args:
+            place_id: Identificador do estabelecimento
+            groups: Grupos de campos desejados (padrão: todos)
+        
+        Returns:
+            Tupla (campos em cache, grupos ausentes ou expirados)
+        """
+        details: Dict = {}
+        missing: List[str] = []
+        for group in groups or PLACE_DETAILS_FIELD_GROUPS:
+            cached = self.cache.get(f"{place_id}:{group}", ttl=self.ttls.get(group))
+            with self._lock:
+                if cached is None:
+                    self.misses[group] += 1
+                    missing.append(group)
+                else:
+                    self.hits[group] += 1
+                    details.update(cached)
+        return details, missing
+    
+    def set(self, place_id: str, details: Dict, groups: List[str]):
+        """Guarda os campos de cada grupo consultado (inclusive os vazios)"""
+        for group in groups:
+            fields = PLACE_DETAILS_FIELD_GROUPS[group]
+            self.cache.set(f"{place_id}:{group}", {f: details[f] for f in fields if f in details})
+    
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Acertos e faltas por grupo de campos"""
+        with self._lock:
+            return {group: {'hits': self.hits[group], 'misses': self.misses[group]}
+                    for group in PLACE_DETAILS_FIELD_GROUPS}
+
+
+class _LazyGroups:
+    """Consultas pendentes de um estabelecimento preguiçoso, compartilhadas pelas cópias"""
+    
+    def __init__(self, loaders: Dict[str, Callable[[], Dict]]):
+        self._loaders = dict(loaders)
+        self._values: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+    
+    def fetch(self, group: str) -> Dict:
+        """Campos de um grupo, consultados uma única vez"""
+        with self._lock:
+            if group not in self._values:
+                self._values[group] = self._loaders.pop(group)() or {}
+            return self._values[group]
+
+
+class LazyBusiness(dict):
+    """
+    Estabelecimento cujos campos fora do perfil são buscados só quando lidos
+    
+    Funciona como um dicionário comum; ler (business['fotos'],
+    business.get('fotos')) uma chave preguiçosa dispara a consulta apenas do
+    grupo de campos dela (ler o website não busca fotos nem avaliações).
+    business.copy(), copy.copy e copy.deepcopy também são preguiçosos e
+    compartilham as consultas com o original. {**business}, dict(business),
+    pickle e a serialização JSON levam apenas os campos já carregados.
+    """
+    
+    def __init__(self, data: Dict, loaders: Dict[str, Callable[[], Dict]],
+                 keys_by_group: Dict[str, List[str]]):
+        """
+        Args:
+            data: Campos já carregados
+            loaders: Função que busca cada grupo de campos
+            keys_by_group: Chaves do lead preenchidas por cada grupo
+        """
+        super().__init__(data)
+        self._groups = _LazyGroups(loaders)
+        self._pending = {key: group for group, keys in keys_by_group.items()
+                         for key in keys if key not in data}
+    
+    def _load_group(self, group: str):
+        """Preenche as chaves pendentes de um grupo"""
+        values = self._groups.fetch(group)
+        for key in [k for k, g in list(self._pending.items()) if g == group]:
+            if self._pending.pop(key, None) is not None and key in values:
+                dict.__setitem__(self, key, values[key])
+    
+    def load(self) -> 'LazyBusiness':
+        """Busca agora todos os campos preguiçosos ainda não carregados"""
+        for group in set(self._pending.values()):
+            self._load_group(group)
+        return self
+    
+    def __missing__(self, key):
+        group = self._pending.get(key)
+        if group is not None:
+            self._load_group(group)
+            if dict.__contains__(self, key):
+                return dict.__getitem__(self, key)
+        raise KeyError(key)
+    
+    def get(self, key, default=None):
+        group = self._pending.get(key)
+        if group is not None:
+            self._load_group(group)
+        return dict.get(self, key, default)
+    
+    def setdefault(self, key, default=None):
+        group = self._pending.get(key)
+        if group is not None:
+            self._load_group(group)
+        return dict.setdefault(self, key, default)
+    
+    # Valores atribuídos pelo consumidor prevalecem sobre os da consulta
+    def __setitem__(self, key, value):
+        self._pending.pop(key, None)
+        dict.__setitem__(self, key, value)
+    
+    def update(self, *args, **kwargs):
+        values = dict(*args, **kwargs)
+        for key in values:
+            self._pending.pop(key, None)
+        dict.update(self, values)
+    
+    def copy(self) -> 'LazyBusiness':
+        """Cópia rasa, ainda preguiçosa, que compartilha as consultas com o original"""
+        clone = LazyBusiness.__new__(LazyBusiness)
+        dict.update(clone, self)
+        clone._groups = self._groups
+        clone._pending = dict(self._pending)
+        return clone
+    
+    __copy__ = copy
+    
+    def __deepcopy__(self, memo) -> 'LazyBusiness':
+        clone = self.copy()
+        for key, value in clone.items():
+            dict.__setitem__(clone, key, copy.deepcopy(value, memo))
+        return clone
+    
+    def __reduce__(self):
+        # As funções de consulta não são serializáveis: vão só os campos carregados
+        return (dict, (dict(self),))
+
+
+_place_details_cache: Optional[PlaceDetailsCache] = None
+
+
+def get_place_details_cache() -> PlaceDetailsCache:
+    """Retorna o cache de Place Details compartilhado"""
+    global _place_details_cache
+    if _place_details_cache is None:
+        _place_details_cache = PlaceDetailsCache(
+            PersistentCache(
+                "place_details",
+                db_path=Config.CACHE_DB_PATH,
+                max_entries=Config.PLACE_CACHE_MAX_ENTRIES
+            ),
+            ttls={
+                'basico': Config.PLACE_CACHE_TTL_BASICO,
+                'contato': Config.PLACE_CACHE_TTL_CONTATO,
+                'dinamico': Config.PLACE_CACHE_TTL_DINAMICO,
+            }
+        )
+    return _place_details_cache
 
 class GoogleMapsSearchTool(BaseTool):
     """Ferramenta para buscar estabelecimentos no Google Maps"""
@@ -17,26 +407,36 @@ class GoogleMapsSearchTool(BaseTool):
     name: str = "GoogleMapsSearch"
     description: str = "Ferramenta para pesquisar estabelecimentos no Google Maps usando diferentes métodos"
     
-    def __init__(self):
+    def __init__(self, lead_writer: Optional[LeadWriteBehindQueue] = None, details_profile: Optional[str] = None):
         super().__init__(name=self.name, description=self.description)
-        self.gmaps = googlemaps.Client(key=Config.GOOGLE_MAPS_API_KEY) if Config.GOOGLE_MAPS_API_KEY else None
+        # Perfil de campos da Place Details API (minimal, contact ou full)
+        self.details_profile = details_profile or Config.PLACE_DETAILS_PROFILE
+        if self.details_profile not in PLACE_DETAILS_PROFILES:
+            raise ValueError(f"Perfil de campos desconhecido: {self.details_profile}")
+        # Quem repete as chamadas é _call_api (backoff, redução da taxa e
+        # disjuntor). O cliente não repete erros de cota e, com retry_timeout
+        # quase zero, desiste logo dos erros HTTP 5xx (lançando Timeout) em
+        # vez de repeti-los por conta própria. Zero não serve: o cliente
+        # recusaria até a primeira tentativa.
+        self.gmaps = googlemaps.Client(
+            key=Config.GOOGLE_MAPS_API_KEY,
+            retry_timeout=Config.API_RETRY_TIMEOUT,
+            retry_over_query_limit=False
+        ) if Config.GOOGLE_MAPS_API_KEY else None
         self.driver: Optional[webdriver.Chrome] = None
+        # Fila opcional de gravação em segundo plano dos estabelecimentos encontrados
+        self.lead_writer = lead_writer
+        # Sem chave da API a busca usará scraping: abrir os navegadores já
+        if not self.gmaps and Config.WEBDRIVER_PREWARM:
+            get_driver_pool().prewarm(background=True)
         
     def setup_driver(self):
-        """Configura o driver do Selenium para web scraping"""
-        chrome_options = Options()
-        if Config.HEADLESS_MODE:
-            chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        
-        self.driver = webdriver.Chrome(options=chrome_options)
-        self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        """Configura o driver do Selenium para web scraping (fora do pool)"""
+        self.driver = create_chrome_driver()
         
-    def search_businesses(self, search_term: str, location: str, radius: int = 10000, max_results: int = 50) -> List[Dict]:
+    def search_businesses(self, search_term: str, location: str, radius: int = 10000, max_results: int = 50,
+                          tiled: Optional[bool] = None,
+                          on_business: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
         """
         Busca estabelecimentos no Google Maps
         
@@ -45,154 +445,746 @@ class GoogleMapsSearchTool(BaseTool):
             location: Localização (ex: "São Paulo, SP")
             radius: Raio de busca em metros
             max_results: Número máximo de resultados
+            tiled: Divide a área em subáreas (iter_businesses_tiled); por padrão,
+                ativado quando o raio passa de Config.TILED_SEARCH_MIN_RADIUS
+            on_business: Função chamada com cada estabelecimento assim que ele
+                fica pronto, antes do fim da busca
             
         Returns:
             Lista de estabelecimentos encontrados
         """
+        businesses = []
         try:
-            # Tentar usar Google Maps API primeiro
-            if self.gmaps:
-                return self._search_with_api(search_term, location, radius, max_results)
-            else:
-                print("⚠️  Chave da API do Google Maps não configurada. Usando web scraping como alternativa.")
-                # Fallback para web scraping
-                return self._search_with_scraping(search_term, location, max_results)
-                
+            for business in self.iter_search(search_term, location, radius, max_results, tiled, on_business):
+                businesses.append(business)
         except Exception as e:
             print(f"Erro ao buscar estabelecimentos: {e}")
-            return []
+        return businesses
     
-    def _search_with_api(self, search_term: str, location: str, radius: int, max_results: int) -> List[Dict]:
-        """Busca usando Google Maps API"""
-        if not self.gmaps:
-            return []
+    def iter_search(self, search_term: str, location: str, radius: int = 10000, max_results: int = 50,
+                    tiled: Optional[bool] = None,
+                    on_business: Optional[Callable[[Dict], None]] = None) -> Iterator[Dict]:
+        """
+        Versão em fluxo de search_businesses: entrega cada estabelecimento assim que fica pronto
+        
+        Cada estabelecimento é passado à fila de gravação (lead_writer) e ao
+        callback on_business no momento em que chega, de modo que gravação e
+        enriquecimento trabalham enquanto a busca continua.
+        
+        Args:
+            search_term: Termo de busca (ex: "restaurante", "dentista")
+            location: Localização (ex: "São Paulo, SP")
+            radius: Raio de busca em metros
+            max_results: Número máximo de resultados
+            tiled: Divide a área em subáreas (ver search_businesses)
+            on_business: Função chamada com cada estabelecimento
             
+        Yields:
+            Estabelecimentos encontrados
+        """
+        # Tentar usar Google Maps API primeiro
+        if self.gmaps and places_circuit_breaker.is_open:
+            print("⚠️  API do Google Maps indisponível no momento. Usando web scraping como alternativa.")
+            source = iter(self._search_with_scraping(search_term, location, max_results))
+        elif self.gmaps:
+            if tiled is None:
+                tiled = radius > Config.TILED_SEARCH_MIN_RADIUS
+            if tiled:
+                source = self.iter_businesses_tiled(search_term, location, radius, max_results)
+            else:
+                source = self.iter_businesses(search_term, location, radius, max_results)
+        else:
+            print("⚠️  Chave da API do Google Maps não configurada. Usando web scraping como alternativa.")
+            # Fallback para web scraping
+            source = iter(self._search_with_scraping(search_term, location, max_results))
+        
+        delivered = []
         try:
-            # Geocodificar a localização
-            geocode_result = self.gmaps.geocode(location)  # type: ignore
-            if not geocode_result:
-                raise ValueError(f"Localização não encontrada: {location}")
+            for business in source:
+                yield self._deliver(business, search_term, location, on_business)
+                delivered.append(business)
+        except Exception as e:
+            # Os estabelecimentos já entregues continuam válidos
+            print(f"Erro na busca via API: {e}")
+            if not isinstance(e, CircuitOpenError) and not is_retryable_api_error(e):
+                return
             
-            lat_lng = geocode_result[0]['geometry']['location']
+            # API indisponível no meio da busca: completar via scraping
+            remaining = max_results - len(delivered)
+            if remaining <= 0:
+                return
+            print(f"⚠️  Completando os {remaining} resultados restantes via web scraping.")
+            # O endereço do scraping não segue o formato da API: comparar por nome e place_id
+            seen = {normalize_key(b.get('nome', '')) for b in delivered}
+            seen |= {b['place_id'] for b in delivered if b.get('place_id')}
+            for business in self._search_with_scraping(search_term, location, max_results):
+                if remaining <= 0:
+                    break
+                if normalize_key(business.get('nome', '')) in seen or business.get('place_id') in seen:
+                    continue
+                yield self._deliver(business, search_term, location, on_business)
+                remaining -= 1
+    
+    def _deliver(self, business: Dict, search_term: str, location: str,
+                 on_business: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """Passa o estabelecimento à fila de gravação e ao callback, antes de entregá-lo"""
+        self._hand_off(business, search_term, location)
+        if on_business:
+            try:
+                on_business(business)
+            except Exception as e:
+                print(f"Erro no callback de estabelecimento: {e}")
+        return business
+    
+    def _hand_off(self, business: Dict, search_term: str, location: str):
+        """
+        Entrega o estabelecimento à fila de gravação, sem esperar pelo disco
+        
+        Vai só o que já foi carregado: campos preguiçosos (LazyBusiness) não
+        são consultados para a gravação.
+        """
+        if self.lead_writer:
+            self.lead_writer.submit({**business, 'termo_busca': search_term, 'localizacao_busca': location})
+    
+    def iter_businesses(self, search_term: str, location: str, radius: int = 10000,
+                        max_results: int = 50) -> Iterator[Dict]:
+        """
+        Busca estabelecimentos via API, entregando cada um assim que estiver pronto
+        
+        Segue o next_page_token da Places API (até 60 resultados por busca).
+        A espera obrigatória para ativação do token da próxima página corre em
+        paralelo com a busca de detalhes da página atual.
+        
+        Args:
+            search_term: Termo de busca (ex: "restaurante", "dentista")
+            location: Localização (ex: "São Paulo, SP")
+            radius: Raio de busca em metros
+            max_results: Número máximo de resultados
             
-            # Buscar estabelecimentos próximos
-            places_result = self.gmaps.places_nearby(  # type: ignore
-                location=lat_lng,
-                radius=radius,
-                keyword=search_term,
-                type="establishment"
+        Yields:
+            Estabelecimentos, na ordem retornada pela API
+        """
+        if not self.gmaps:
+            return
+        
+        lat_lng = self._geocode(location)
+        
+        details_executor = ThreadPoolExecutor(max_workers=Config.PLACES_DETAILS_WORKERS)
+        page_executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            page_future: Optional[Future] = page_executor.submit(
+                self._fetch_places_page, lat_lng, radius, search_term
             )
+            requested = 0
             
-            businesses = []
-            for place in places_result.get('results', [])[:max_results]:
-                # Obter detalhes do estabelecimento
-                details = self.gmaps.place(  # type: ignore
-                    place_id=place['place_id'],
-                    fields=['name', 'formatted_address', 'formatted_phone_number', 
-                           'website', 'rating', 'user_ratings_total', 'opening_hours',
-                           'geometry', 'types', 'photos']
-                )
+            while page_future is not None and requested < max_results:
+                page = page_future.result()
+                results = page.get('results', [])[:max_results - requested]
+                requested += len(results)
                 
-                place_details = details.get('result', {})
+                # Detalhes buscados em paralelo; o limitador compartilhado controla o ritmo
+                futures = [
+                    details_executor.submit(self._fetch_place_details, place['place_id'])
+                    for place in results
+                ]
                 
-                business = {
-                    'nome': place_details.get('name', ''),
-                    'endereco': place_details.get('formatted_address', ''),
-                    'telefone': place_details.get('formatted_phone_number', ''),
-                    'website': place_details.get('website', ''),
-                    'categoria': ', '.join(place_details.get('types', [])),
-                    'avaliacao': place_details.get('rating', 0),
-                    'numero_avaliacoes': place_details.get('user_ratings_total', 0),
-                    'horario_funcionamento': self._format_opening_hours(place_details.get('opening_hours', {})),
-                    'latitude': place_details.get('geometry', {}).get('location', {}).get('lat', 0),
-                    'longitude': place_details.get('geometry', {}).get('location', {}).get('lng', 0),
-                    'place_id': place['place_id'],
-                    'fotos': self._get_photo_urls(place_details.get('photos', []))
-                }
+                # A próxima página é pedida já, enquanto os detalhes desta chegam
+                token = page.get('next_page_token')
+                page_future = None
+                if token and requested < max_results:
+                    page_future = page_executor.submit(
+                        self._fetch_places_page, lat_lng, radius, search_term, token, time.monotonic()
+                    )
                 
-                businesses.append(business)
-                
-                # Delay para evitar rate limiting
-                time.sleep(Config.SEARCH_DELAY)
+                for future in futures:
+                    business = future.result()
+                    if business:
+                        yield business
+        finally:
+            # Se o consumidor parar antes do fim, descarta o trabalho pendente
+            details_executor.shutdown(wait=False, cancel_futures=True)
+            page_executor.shutdown(wait=False, cancel_futures=True)
+    
+    def iter_businesses_tiled(self, search_term: str, location: str, radius: int = 50000,
+                              max_results: int = 200) -> Iterator[Dict]:
+        """
+        Busca estabelecimentos dividindo a área em subáreas hexagonais
+        
+        Cada busca do places_nearby para em 60 resultados, o que numa área
+        grande devolve só o centro mais denso. Aqui a área começa com um
+        círculo (ou, acima do raio máximo da API, uma grade de círculos) e
+        toda subárea que atinge o limite é dividida em 7 círculos com metade
+        do raio, até Config.TILE_MIN_RADIUS. As subáreas rodam em paralelo
+        sob o limitador de taxa e os resultados são deduplicados por place_id.
+        
+        Args:
+            search_term: Termo de busca (ex: "restaurante", "dentista")
+            location: Localização (ex: "São Paulo, SP")
+            radius: Raio de busca em metros
+            max_results: Número máximo de resultados
             
-            return businesses
+        Yields:
+            Estabelecimentos, na ordem em que os detalhes ficam prontos
+        """
+        if not self.gmaps:
+            return
+        
+        center = self._geocode(location)
+        tile_radius = min(radius, PLACES_NEARBY_MAX_RADIUS)
+        
+        tile_executor = ThreadPoolExecutor(max_workers=Config.TILE_SEARCH_WORKERS)
+        details_executor = ThreadPoolExecutor(max_workers=Config.PLACES_DETAILS_WORKERS)
+        tile_futures: Dict[Future, float] = {}
+        detail_futures = set()
+        seen = set()
+        
+        def submit_tiles(lat: float, lng: float, area_radius: float, sub_radius: float):
+            for tile_lat, tile_lng in hex_tiles(lat, lng, area_radius, sub_radius):
+                future = tile_executor.submit(
+                    self._collect_tile, {'lat': tile_lat, 'lng': tile_lng}, sub_radius, search_term
+                )
+                tile_futures[future] = sub_radius
+        
+        try:
+            if radius > tile_radius:
+                submit_tiles(center['lat'], center['lng'], radius, tile_radius)
+            else:
+                tile_futures[tile_executor.submit(self._collect_tile, center, radius, search_term)] = radius
             
-        except Exception as e:
-            print(f"Erro na busca via API: {e}")
+            while tile_futures or detail_futures:
+                done, _ = wait(list(tile_futures) + list(detail_futures), return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in detail_futures:
+                        detail_futures.discard(future)
+                        business = future.result()
+                        if business:
+                            yield business
+                        continue
+                    
+                    sub_radius = tile_futures.pop(future)
+                    try:
+                        tile_lat, tile_lng, places = future.result()
+                    except Exception as e:
+                        print(f"Erro ao buscar subárea: {e}")
+                        if isinstance(e, CircuitOpenError) or is_retryable_api_error(e):
+                            raise
+                        continue
+                    
+                    # Só entram lugares dentro do círculo pedido e ainda não vistos
+                    inside = self._places_within(places, center, radius)
+                    for place_id in inside:
+                        if len(seen) >= max_results:
+                            break
+                        if place_id not in seen:
+                            seen.add(place_id)
+                            detail_futures.add(details_executor.submit(self._fetch_place_details, place_id))
+                    
+                    # Subárea saturada: subdividir enquanto ainda faltam resultados
+                    half = sub_radius / 2
+                    if (len(places) >= PLACES_NEARBY_CAP and half >= Config.TILE_MIN_RADIUS
+                            and len(seen) < max_results):
+                        submit_tiles(tile_lat, tile_lng, sub_radius, half)
+                
+                if len(seen) >= max_results:
+                    # Meta atingida: subáreas pendentes não são mais necessárias
+                    for future in list(tile_futures):
+                        if future.cancel():
+                            del tile_futures[future]
+        finally:
+            tile_executor.shutdown(wait=False, cancel_futures=True)
+            details_executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _collect_tile(self, lat_lng: Dict, radius: float, search_term: str) -> Tuple[float, float, List[Dict]]:
+        """
+        Lista todos os lugares de uma subárea, seguindo o next_page_token
+        
+        Returns:
+            Tupla (lat, lng, resultados do places_nearby)
+        """
+        page = self._fetch_places_page(lat_lng, int(radius), search_term)
+        places = list(page.get('results', []))
+        while page.get('next_page_token'):
+            page = self._fetch_places_page(lat_lng, int(radius), search_term,
+                                           page['next_page_token'], time.monotonic())
+            places.extend(page.get('results', []))
+        return lat_lng['lat'], lat_lng['lng'], places
+    
+    def _places_within(self, places: List[Dict], center: Dict, radius: float) -> List[str]:
+        """Filtra os place_ids cuja localização está dentro do círculo"""
+        if not places:
             return []
+        locations = [place.get('geometry', {}).get('location', center) for place in places]
+        distances = haversine_m(
+            center['lat'], center['lng'],
+            np.array([loc['lat'] for loc in locations], dtype=float),
+            np.array([loc['lng'] for loc in locations], dtype=float)
+        )
+        return [place['place_id'] for place, dist in zip(places, distances) if dist <= radius]
+    
+    def _call_api(self, method: str, *args, **kwargs):
+        """
+        Chama um método do cliente googlemaps com limite de taxa, novas tentativas e disjuntor
+        
+        Erros transitórios (cota, erro interno, HTTP 5xx, rede) são repetidos
+        com backoff exponencial e jitter; erros de cota também reduzem a taxa
+        do limitador, que volta aos poucos ao normal com as chamadas bem-sucedidas.
+        Com o circuito aberto, lança CircuitOpenError sem chamar a API.
+        """
+        def attempt():
+            places_rate_limiter.acquire()
+            return getattr(self.gmaps, method)(*args, **kwargs)
+        
+        result = places_circuit_breaker.call(
+            call_with_retry, attempt,
+            retries=Config.API_MAX_RETRIES,
+            base_delay=Config.API_BACKOFF_BASE,
+            max_delay=Config.API_BACKOFF_MAX,
+            is_retryable=is_retryable_api_error,
+            on_retry=_slow_down_on_quota
+        )
+        _recover_rate()
+        return result
+    
+    def _geocode(self, location: str) -> Dict:
+        """
+        Converte a localização em coordenadas, consultando antes o cache em disco
+        
+        Returns:
+            Dicionário com 'lat' e 'lng'
+        """
+        cache = get_geocode_cache()
+        key = normalize_key(location)
+        lat_lng = cache.get(key)
+        if lat_lng is not None:
+            return lat_lng
+        
+        geocode_result = self._call_api('geocode', location)
+        if not geocode_result:
+            raise ValueError(f"Localização não encontrada: {location}")
+        
+        lat_lng = geocode_result[0]['geometry']['location']
+        cache.set(key, lat_lng)
+        return lat_lng
+    
+    def _fetch_places_page(self, lat_lng: Dict, radius: int, search_term: str,
+                           page_token: Optional[str] = None, token_received_at: float = 0.0) -> Dict:
+        """
+        Busca uma página de resultados do places_nearby
+        
+        O next_page_token só é aceito pela API alguns segundos depois de
+        emitido; antes disso a resposta é INVALID_REQUEST.
+        """
+        if not page_token:
+            return self._call_api(
+                'places_nearby',
+                location=lat_lng,
+                radius=radius,
+                keyword=search_term,
+                type="establishment"
+            )
+        
+        time.sleep(max(0.0, Config.NEXT_PAGE_TOKEN_DELAY - (time.monotonic() - token_received_at)))
+        for attempt in range(3):
+            try:
+                return self._call_api('places_nearby', page_token=page_token)
+            except googlemaps.exceptions.ApiError as e:
+                if e.status != "INVALID_REQUEST" or attempt == 2:
+                    raise
+                time.sleep(1)
+        return {}
+    
+    def _fetch_place_details(self, place_id: str, groups: Optional[List[str]] = None,
+                             lazy: Optional[bool] = None) -> Optional[Dict]:
+        """
+        Obtém os detalhes de um estabelecimento respeitando o limite de taxa
+        
+        Consulta o cache primeiro e pede à API somente os grupos de campos
+        ausentes ou expirados. Os grupos fora do perfil não são pedidos; com
+        Config.PLACE_DETAILS_LAZY, ficam disponíveis sob demanda (LazyBusiness).
+        
+        Args:
+            place_id: Identificador do estabelecimento
+            groups: Grupos de campos (padrão: os do perfil da ferramenta)
+            lazy: Permite buscar depois os demais grupos (padrão: Config.PLACE_DETAILS_LAZY)
+        """
+        groups = groups or PLACE_DETAILS_PROFILES[self.details_profile]
+        cache = get_place_details_cache()
+        place_details, missing = cache.get(place_id, groups)
+        
+        if missing:
+            fields = [f for group in missing for f in PLACE_DETAILS_FIELD_GROUPS[group]]
+            try:
+                details = self._call_api(
+                    'place',
+                    place_id=place_id,
+                    fields=fields
+                )
+            except Exception as e:
+                print(f"Erro ao obter detalhes do estabelecimento {place_id}: {e}")
+                # API indisponível: a busca precisa saber, para completar via scraping
+                if isinstance(e, CircuitOpenError) or is_retryable_api_error(e):
+                    raise
+                return None
+            
+            result = details.get('result', {})
+            cache.set(place_id, result, missing)
+            place_details.update(result)
+        
+        business = self._build_business(place_id, place_details, groups)
+        
+        lazy_groups = [g for g in PLACE_DETAILS_FIELD_GROUPS if g not in groups]
+        if lazy_groups and (Config.PLACE_DETAILS_LAZY if lazy is None else lazy):
+            return LazyBusiness(
+                business,
+                loaders={g: (lambda g=g: self._fetch_lazy_fields(place_id, [g])) for g in lazy_groups},
+                keys_by_group={g: LEAD_KEYS_BY_GROUP[g] for g in lazy_groups}
+            )
+        return business
+    
+    def _fetch_lazy_fields(self, place_id: str, groups: List[str]) -> Dict:
+        """Busca os grupos preguiçosos de um LazyBusiness; com a API indisponível, ficam vazios"""
+        try:
+            return self._fetch_place_details(place_id, groups, lazy=False) or {}
+        except Exception:
+            return {}
+    
+    def _build_business(self, place_id: str, place_details: Dict, groups: Optional[List[str]] = None) -> Dict:
+        """
+        Converte a resposta da Place Details API no formato de lead
+        
+        Só as chaves dos grupos pedidos são preenchidas (padrão: todos).
+        """
+        groups = groups or list(PLACE_DETAILS_FIELD_GROUPS)
+        business: Dict = {}
+        if 'basico' in groups:
+            business.update({
+                'nome': place_details.get('name', ''),
+                'endereco': place_details.get('formatted_address', ''),
+                'categoria': ', '.join(place_details.get('types', [])),
+                'latitude': place_details.get('geometry', {}).get('location', {}).get('lat', 0),
+                'longitude': place_details.get('geometry', {}).get('location', {}).get('lng', 0),
+            })
+        if 'contato' in groups:
+            business.update({
+                'telefone': place_details.get('formatted_phone_number', ''),
+                'website': place_details.get('website', ''),
+            })
+        if 'dinamico' in groups:
+            business.update({
+                'avaliacao': place_details.get('rating', 0),
+                'numero_avaliacoes': place_details.get('user_ratings_total', 0),
+                'horario_funcionamento': self._format_opening_hours(place_details.get('opening_hours', {})),
+                'fotos': self._get_photo_urls(place_details.get('photos', [])),
+            })
+        business['place_id'] = place_id
+        return business
     
     def _search_with_scraping(self, search_term: str, location: str, max_results: int) -> List[Dict]:
         """Busca usando web scraping do Google Maps"""
         try:
-            self.setup_driver()
-            assert self.driver, "O driver do Selenium não foi inicializado corretamente."
-            
-            # Construir URL de busca
-            query = f"{search_term} {location}"
-            url = f"https://www.google.com/maps/search/{query}"
+            with get_driver_pool().acquire() as driver:
+                self.driver = driver
+                return self._scrape_results(search_term, location, max_results)
             
-            self.driver.get(url)
-            time.sleep(3)
-            
-            # Aguardar carregamento dos resultados
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "div[role='feed']"))
-            )
-            
-            businesses = []
+        except Exception as e:
+            print(f"Erro no web scraping: {e}")
+            return []
+        finally:
+            self.driver = None
+    
+    def _scrape_results(self, search_term: str, location: str, max_results: int) -> List[Dict]:
+        """Percorre a lista de resultados do Google Maps com o driver atual"""
+        assert self.driver, "O driver do Selenium não foi inicializado corretamente."
+        
+        if Config.SCRAPING_EXTRACTION_MODE == "network":
+            return self._scrape_network(search_term, location, max_results)
+        if Config.SCRAPING_EXTRACTION_MODE == "feed":
+            return self._scrape_feed(search_term, location, max_results)
+        
+        # Abrir a página de busca
+        self._open_search(search_term, location)
+        
+        # Aguardar carregamento dos resultados
+        WebDriverWait(self.driver, 10).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "div[role='feed']"))
+        )
+        
+        businesses = []
+        seen_places = set()
+        processed = 0  # resultados da lista já examinados, válidos ou não
+        
+        # Scroll para carregar mais resultados
+        feed = self.driver.find_element(By.CSS_SELECTOR, "div[role='feed']")
+        scroller = FeedScroller(self.driver, feed)
+        
+        while len(businesses) < max_results:
+            has_more = scroller.scroll()
             
-            # Scroll para carregar mais resultados
-            feed = self.driver.find_element(By.CSS_SELECTOR, "div[role='feed']")
+            result_elements = self.driver.find_elements(By.CSS_SELECTOR, "a[href*='https://www.google.com/maps/place/']")
             
-            last_height = self.driver.execute_script("return arguments[0].scrollHeight", feed)
+            # Extrair informações dos resultados ainda não examinados
+            while processed < len(result_elements) and len(businesses) < max_results:
+                element = result_elements[processed]
+                processed += 1
+                
+                try:
+                    # Extrair informações básicas do link
+                    business_name = element.get_attribute("aria-label")
+                    href = element.get_attribute("href") or ""
+                    key = place_id_from_url(href) or href
+                    if not business_name or key in seen_places:
+                        continue
+                    seen_places.add(key)
+
+                    element.click()
+                    self._wait_for_place_panel(business_name)
+                    
+                    business_info = self._extract_business_info()
+                    if business_info:
+                        business_info['nome'] = business_name
+                        business_info['url_maps'] = href
+                        businesses.append(business_info)
+                        
+                except Exception as e:
+                    print(f"Erro ao extrair dados de um estabelecimento: {e}")
+                    # Voltar para a página de resultados para continuar
+                    self.driver.back()
+                    WebDriverWait(self.driver, Config.SCROLL_MAX_WAIT).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, "div[role='feed']"))
+                    )
             
+            if not has_more:
+                break
+
+        self._report_scroll(scroller)
+        return businesses[:max_results]
+    
+    def _open_search(self, search_term: str, location: str):
+        """
+        Abre a página de busca do Google Maps
+        
+        Uma localização no formato "@lat,lng,zoomz" centraliza o mapa nesse
+        ponto (usado para buscas por subárea); qualquer outro texto entra na
+        consulta. Antes de navegar, respeita o limite global de buscas
+        (scraping_throttle), quando definido.
+        """
+        assert self.driver, "O driver do Selenium não foi inicializado corretamente."
+        
+        if location.startswith("@"):
+            url = f"https://www.google.com/maps/search/{quote(search_term)}/{location}"
+        else:
+            url = f"https://www.google.com/maps/search/{quote(f'{search_term} {location}')}"
+        
+        if scraping_throttle:
+            scraping_throttle()
+        self.driver.get(url)
+    
+    def _scrape_feed(self, search_term: str, location: str, max_results: int) -> List[Dict]:
+        """
+        Extrai os resultados direto dos cartões da lista, sem clicar em cada um
+        
+        Os cartões carregados são lidos em lote com um único execute_script.
+        A página de detalhes só é aberta, numa aba separada, para os campos de
+        Config.SCRAPING_DETAIL_FIELDS que o cartão não trouxe.
+        """
+        assert self.driver, "O driver do Selenium não foi inicializado corretamente."
+        
+        self._open_search(search_term, location)
+        
+        WebDriverWait(self.driver, 10).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "div[role='feed']"))
+        )
+        feed = self.driver.find_element(By.CSS_SELECTOR, "div[role='feed']")
+        results_tab = self.driver.current_window_handle
+        details_tab: Optional[str] = None
+        scroller = FeedScroller(self.driver, feed)
+        
+        businesses: List[Dict] = []
+        seen_places = set()
+        processed = 0
+        has_more = True
+        
+        try:
             while len(businesses) < max_results:
-                self.driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", feed)
-                time.sleep(2)  # Aguardar carregamento
-                
-                result_elements = self.driver.find_elements(By.CSS_SELECTOR, "a[href*='https://www.google.com/maps/place/']")
+                cards = self.driver.execute_script(FEED_CARDS_JS, feed, processed) or []
+                processed += len(cards)
                 
-                # Extrair informações
-                for element in result_elements[len(businesses):]:
+                for card in cards:
                     if len(businesses) >= max_results:
                         break
+                    url = card.get('url', '')
+                    key = place_id_from_url(url) or url
+                    if not card.get('nome') or key in seen_places:
+                        continue
+                    seen_places.add(key)
                     
-                    try:
-                        # Extrair informações básicas do link
-                        business_name = element.get_attribute("aria-label")
-                        if not business_name or business_name in [b.get('nome') for b in businesses]:
-                            continue
-
-                        element.click()
-                        time.sleep(2)
-                        
-                        business_info = self._extract_business_info()
-                        if business_info:
-                            business_info['nome'] = business_name
-                            businesses.append(business_info)
-                            
-                    except Exception as e:
-                        print(f"Erro ao extrair dados de um estabelecimento: {e}")
-                        # Voltar para a página de resultados para continuar
-                        self.driver.back()
-                        time.sleep(2)
+                    business = self._parse_feed_card(card)
+                    missing = [f for f in Config.SCRAPING_DETAIL_FIELDS if not business.get(f)]
+                    if missing and url:
+                        if details_tab is None:
+                            self.driver.switch_to.new_window('tab')
+                            details_tab = self.driver.current_window_handle
+                            if Config.LEAN_BROWSER_PROFILE:
+                                apply_lean_profile(self.driver)
+                        else:
+                            self.driver.switch_to.window(details_tab)
+                        try:
+                            self.driver.get(url)
+                            details = self._extract_business_info(go_back=False) or {}
+                            for field in missing:
+                                if details.get(field):
+                                    business[field] = details[field]
+                        finally:
+                            self.driver.switch_to.window(results_tab)
+                    businesses.append(business)
                 
-                new_height = self.driver.execute_script("return arguments[0].scrollHeight", feed)
-                if new_height == last_height:
+                # Depois da última rolagem, os cartões novos ainda são lidos acima
+                if not has_more:
                     break
-                last_height = new_height
-
-            return businesses[:max_results]
-            
-        except Exception as e:
-            print(f"Erro no web scraping: {e}")
-            return []
+                has_more = scroller.scroll()
         finally:
-            if self.driver:
-                self.driver.quit()
+            if details_tab is not None:
+                self.driver.switch_to.window(details_tab)
+                self.driver.close()
+                self.driver.switch_to.window(results_tab)
+        
+        self._report_scroll(scroller)
+        return businesses
+    
+    def _scrape_network(self, search_term: str, location: str, max_results: int) -> List[Dict]:
+        """
+        Extrai os resultados das respostas de busca recebidas pela página
+        
+        As respostas XHR da busca já trazem todos os campos de cada resultado;
+        elas são lidas via DevTools (SearchResponseCapture) e decodificadas
+        por maps_payload_parser, sem navegar por estabelecimento. A primeira
+        página de resultados vem embutida no HTML, então os cartões da lista
+        que não apareceram na rede são completados pelos dados do cartão.
+        """
+        assert self.driver, "O driver do Selenium não foi inicializado corretamente."
+        
+        capture = SearchResponseCapture(self.driver)
+        capture.drain()  # descarta eventos de usos anteriores do navegador
+        
+        self._open_search(search_term, location)
+        
+        WebDriverWait(self.driver, 10).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "div[role='feed']"))
+        )
+        feed = self.driver.find_element(By.CSS_SELECTOR, "div[role='feed']")
+        scroller = FeedScroller(self.driver, feed)
+        
+        businesses: List[Dict] = []
+        seen_places = set()
+        network_names = set()
+        processed = 0
+        has_more = True
+        
+        while len(businesses) < max_results:
+            found = []
+            for body in capture.drain():
+                found.extend(parse_search_response(body))
+            
+            cards = self.driver.execute_script(FEED_CARDS_JS, feed, processed) or []
+            processed += len(cards)
+            found.extend(self._parse_feed_card(card) for card in cards)
+            
+            for business in found:
+                if len(businesses) >= max_results:
+                    break
+                if not business['nome']:
+                    continue
+                # Estabelecimentos diferentes podem ter o mesmo nome (redes):
+                # o nome só identifica quando não há place_id nem link
+                url_id = place_id_from_url(business.get('url_maps', ''))
+                key = business.get('place_id') or url_id or business['nome']
+                if key in seen_places:
+                    continue
+                # Cartão cujo link traz só o id interno não é comparável ao
+                # place_id da rede: entra apenas se a rede não trouxe o mesmo nome
+                if 'url_maps' in business and not url_id.startswith('ChIJ') \
+                        and business['nome'] in network_names:
+                    continue
+                seen_places.add(key)
+                if 'url_maps' not in business:
+                    network_names.add(business['nome'])
+                businesses.append(business)
+            
+            if not has_more:
+                break
+            has_more = scroller.scroll()
+        
+        self._report_scroll(scroller)
+        return businesses
     
-    def _extract_business_info(self) -> Optional[Dict]:
-        """Extrai informações do estabelecimento da página"""
+    def _wait_for_place_panel(self, business_name: str):
+        """Espera o painel do estabelecimento clicado exibir o nome dele"""
+        try:
+            WebDriverWait(self.driver, Config.SCROLL_MAX_WAIT).until(  # type: ignore
+                lambda driver: any(business_name in h1.text for h1 in driver.find_elements(By.CSS_SELECTOR, "h1"))
+            )
+        except TimeoutException:
+            pass  # _extract_business_info lida com o painel incompleto
+    
+    def _report_scroll(self, scroller: FeedScroller):
+        """Mostra quanto da busca foi espera pela página e quanto foi processamento"""
+        if Config.DEBUG:
+            stats = scroller.stats()
+            print(f"Rolagem: {stats['rolagens']} rolagens, {stats['tempo_espera']}s esperando, "
+                  f"{stats['tempo_trabalho']}s processando (parada: {stats['motivo_parada']})")
+    
+    def _card_website(self, href: str) -> str:
+        """Website do botão do cartão, sem o redirecionamento do Google (/url?q=...)"""
+        if '/url?' in href:
+            return parse_qs(urlparse(href).query).get('q', [''])[0]
+        return href
+    
+    def _parse_feed_card(self, card: Dict) -> Dict:
+        """Converte um cartão extraído por FEED_CARDS_JS no formato de lead"""
+        business = {
+            'nome': card.get('nome', ''),
+            'endereco': '',
+            'telefone': '',
+            'website': self._card_website(card.get('website', '')),
+            'categoria': '',
+            'avaliacao': 0.0,
+            'numero_avaliacoes': 0,
+            'url_maps': card.get('url', ''),
+        }
+        
+        try:
+            business['avaliacao'] = float(card.get('avaliacao', '').strip().replace(',', '.'))
+        except ValueError:
+            pass
+        
+        reviews = ''.join(ch for ch in card.get('numero_avaliacoes', '') if ch.isdigit())
+        if reviews:
+            business['numero_avaliacoes'] = int(reviews)
+        
+        # Linhas: a primeira com conteúdo é "nota", depois "categoria · endereço"
+        # e, quando presente, uma com horário · telefone
+        for line in card.get('linhas', []):
+            parts = [part.strip() for part in line.split('·') if part.strip()]
+            if not parts:
+                continue
+            phone = next((p for p in parts if sum(ch.isdigit() for ch in p) >= 8
+                          and all(ch.isdigit() or ch in ' ()+-' for ch in p)), '')
+            if phone and not business['telefone']:
+                business['telefone'] = phone
+            elif not business['categoria'] and not any(ch.isdigit() for ch in parts[0]):
+                business['categoria'] = parts[0]
+                if len(parts) > 1:
+                    business['endereco'] = parts[-1]
+        
+        return business
+    
+    def _extract_business_info(self, go_back: bool = True) -> Optional[Dict]:
+        """
+        Extrai informações do estabelecimento da página
+        
+        Args:
+            go_back: Volta à página anterior ao final (modo de clique na lista)
+        """
         assert self.driver, "O driver do Selenium não está disponível."
         
         try:
@@ -241,12 +1233,15 @@ class GoogleMapsSearchTool(BaseTool):
                 business['categoria'] = ""
 
             # Voltar para a página de resultados
-            self.driver.back()
+            if go_back:
+                self.driver.back()
             
             return business
             
         except Exception as e:
             print(f"Erro ao extrair informações detalhadas: {e}")
+            if not go_back:
+                return None
             try:
                 self.driver.back()
             except Exception as back_err:
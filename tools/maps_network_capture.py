@@ -0,0 +1,56 @@
+import base64
+import json
+from typing import Dict, List, Pattern
+from tools.maps_payload_parser import SEARCH_RESPONSE_PATTERN
+
+
+class SearchResponseCapture:
+    """
+    Coleta, pelo log de desempenho do Chrome (DevTools), os corpos das
+    respostas de busca do Google Maps
+
+    O driver precisa ter sido criado com o log "performance" habilitado
+    (goog:loggingPrefs). Cada chamada de drain() lê os eventos de rede
+    acumulados desde a anterior e devolve os corpos das respostas cujo
+    download já terminou.
+    """
+
+    def __init__(self, driver, pattern: Pattern = SEARCH_RESPONSE_PATTERN):
+        self.driver = driver
+        self.pattern = pattern
+        # requestId -> URL das respostas de busca ainda sem corpo lido
+        self._pending: Dict[str, str] = {}
+
+    def drain(self) -> List[str]:
+        """Retorna os corpos das respostas de busca concluídas desde a última chamada"""
+        finished = []
+        for entry in self.driver.get_log('performance'):
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+
+            method = message.get('method')
+            params = message.get('params', {})
+            if method == 'Network.responseReceived':
+                url = params.get('response', {}).get('url', '')
+                if self.pattern.search(url):
+                    self._pending[params.get('requestId')] = url
+            elif method == 'Network.loadingFinished' and params.get('requestId') in self._pending:
+                finished.append(params['requestId'])
+            elif method == 'Network.loadingFailed':
+                self._pending.pop(params.get('requestId'), None)
+
+        bodies = []
+        for request_id in finished:
+            url = self._pending.pop(request_id)
+            try:
+                response = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+            except Exception as e:
+                print(f"Erro ao ler resposta de {url}: {e}")
+                continue
+            body = response.get('body', '')
+            if response.get('base64Encoded'):
+                body = base64.b64decode(body).decode('utf-8', errors='replace')
+            bodies.append(body)
+        return bodies
@@ -0,0 +1,145 @@
+import json
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+# Prefixo anti-XSSI que o Google coloca antes do JSON das respostas
+_XSSI_PREFIX = ")]}'"
+
+# URLs das requisições que trazem resultados de busca do Google Maps
+SEARCH_RESPONSE_PATTERN = re.compile(r"/search\?(?:.*&)?tbm=map|/maps/preview/search|/maps/search/")
+
+# Caminhos (índices) de cada campo dentro do registro de um estabelecimento.
+# O formato não é documentado e muda de tempos em tempos: quando um campo
+# parar de vir, basta ajustar o caminho aqui. Vários caminhos por campo são
+# tentados em ordem.
+PLACE_FIELD_PATHS: Dict[str, List[Sequence[int]]] = {
+    'nome': [(11,)],
+    'endereco': [(39,), (18,)],
+    'telefone': [(178, 0, 0), (3, 0)],
+    'website': [(7, 0)],
+    'categorias': [(13,)],
+    'avaliacao': [(4, 7)],
+    'numero_avaliacoes': [(4, 8)],
+    'latitude': [(9, 2)],
+    'longitude': [(9, 3)],
+    'place_id': [(78,)],
+    'horarios': [(34, 1)],
+}
+
+# Onde ficam, na resposta decodificada, a lista de resultados e, em cada
+# resultado, o registro do estabelecimento
+RESULTS_PATH = (0, 1)
+PLACE_RECORD_INDEX = 14
+
+
+def get_path(data: Any, path: Sequence[int], default: Any = None) -> Any:
+    """
+    Percorre listas aninhadas por índices, sem lançar exceção
+
+    Exemplo: get_path(x, (4, 7)) equivale a x[4][7], ou default se algum
+    nível não existir ou não for uma lista.
+    """
+    for index in path:
+        if not isinstance(data, list) or not -len(data) <= index < len(data):
+            return default
+        data = data[index]
+    return default if data is None else data
+
+
+def _first(data: Any, paths: List[Sequence[int]]) -> Any:
+    """Valor do primeiro caminho que existir"""
+    for path in paths:
+        value = get_path(data, path)
+        if value not in (None, '', []):
+            return value
+    return None
+
+
+def decode_response(body: str) -> Any:
+    """
+    Decodifica o corpo de uma resposta de busca do Google Maps
+
+    Aceita tanto o JSON direto com prefixo )]}' quanto o envelope
+    {"c":0,"d":")]}'\\n[...]"} seguido de /*""*/ usado pelo tbm=map.
+    """
+    text = body.strip()
+    if text.endswith('/*""*/'):
+        text = text[:-len('/*""*/')].rstrip()
+    if text.startswith(_XSSI_PREFIX):
+        text = text[len(_XSSI_PREFIX):]
+
+    data = json.loads(text)
+    if isinstance(data, dict) and isinstance(data.get('d'), str):
+        return decode_response(data['d'])
+    return data
+
+
+def _format_hours(hours: Any) -> str:
+    """Converte [[dia, [faixas]], ...] em "dia: faixas; ..." """
+    if not isinstance(hours, list):
+        return ""
+    days = []
+    for day in hours:
+        name = get_path(day, (0,))
+        ranges = get_path(day, (1,), [])
+        if isinstance(name, str):
+            ranges_text = ', '.join(r for r in ranges if isinstance(r, str)) if isinstance(ranges, list) else ''
+            days.append(f"{name}: {ranges_text}" if ranges_text else name)
+    return "; ".join(days)
+
+
+def parse_place(record: List) -> Optional[Dict]:
+    """
+    Converte o registro de um estabelecimento no formato de lead
+
+    Returns:
+        Dicionário do estabelecimento, ou None se o registro não tiver nome
+    """
+    name = _first(record, PLACE_FIELD_PATHS['nome'])
+    if not isinstance(name, str) or not name:
+        return None
+
+    categories = _first(record, PLACE_FIELD_PATHS['categorias']) or []
+    rating = _first(record, PLACE_FIELD_PATHS['avaliacao'])
+    reviews = _first(record, PLACE_FIELD_PATHS['numero_avaliacoes'])
+    lat = _first(record, PLACE_FIELD_PATHS['latitude'])
+    lng = _first(record, PLACE_FIELD_PATHS['longitude'])
+
+    return {
+        'nome': name,
+        'endereco': _first(record, PLACE_FIELD_PATHS['endereco']) or '',
+        'telefone': _first(record, PLACE_FIELD_PATHS['telefone']) or '',
+        'website': _first(record, PLACE_FIELD_PATHS['website']) or '',
+        'categoria': ', '.join(c for c in categories if isinstance(c, str)) if isinstance(categories, list) else '',
+        'avaliacao': float(rating) if isinstance(rating, (int, float)) else 0.0,
+        'numero_avaliacoes': int(reviews) if isinstance(reviews, (int, float)) else 0,
+        'horario_funcionamento': _format_hours(_first(record, PLACE_FIELD_PATHS['horarios'])),
+        'latitude': float(lat) if isinstance(lat, (int, float)) else 0.0,
+        'longitude': float(lng) if isinstance(lng, (int, float)) else 0.0,
+        'place_id': _first(record, PLACE_FIELD_PATHS['place_id']) or '',
+    }
+
+
+def parse_search_response(body: str) -> List[Dict]:
+    """
+    Extrai os estabelecimentos de uma resposta de busca do Google Maps
+
+    Args:
+        body: Corpo da resposta, como recebido pela rede
+
+    Returns:
+        Lista de estabelecimentos (vazia se o formato não for reconhecido)
+    """
+    try:
+        data = decode_response(body)
+    except ValueError:
+        return []
+
+    businesses = []
+    for entry in get_path(data, RESULTS_PATH, []):
+        record = get_path(entry, (PLACE_RECORD_INDEX,))
+        if isinstance(record, list):
+            business = parse_place(record)
+            if business:
+                businesses.append(business)
+    return businesses
@@ -0,0 +1,158 @@
+import math
+import multiprocessing
+import multiprocessing.util
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, Iterator, List, Optional
+from config import Config
+from tools import google_maps_tool
+from tools.google_maps_tool import GoogleMapsSearchTool, hex_tiles, place_id_from_url
+from utils.database import LeadWriteBehindQueue
+
+# Uma busca de scraping: termo, localização (texto ou "@lat,lng,zoomz") e
+# limite de resultados; rotulo é a localização gravada no lead
+ScrapingJob = namedtuple('ScrapingJob', ['search_term', 'location', 'max_results', 'rotulo'],
+                         defaults=(50, None))
+
+
+def tile_jobs(search_term: str, lat: float, lng: float, radius: float, tile_radius: float,
+              max_results: int = 50, rotulo: Optional[str] = None) -> List[ScrapingJob]:
+    """
+    Divide uma área em buscas por subárea (grade hexagonal de hex_tiles)
+
+    Cada subárea vira uma busca centralizada no seu centro, com zoom que
+    enquadra aproximadamente o diâmetro da subárea.
+    """
+    meters_per_pixel = 2 * tile_radius / 1000  # janela de ~1000px
+    zoom = math.log2(156543.03392 * math.cos(math.radians(lat)) / meters_per_pixel)
+    zoom = min(max(int(round(zoom)), 3), 21)
+    return [
+        ScrapingJob(search_term, f"@{tile_lat:.6f},{tile_lng:.6f},{zoom}z", max_results, rotulo)
+        for tile_lat, tile_lng in hex_tiles(lat, lng, radius, tile_radius)
+    ]
+
+
+def place_key(business: Dict) -> str:
+    """Chave de deduplicação de um estabelecimento: link do Maps, place_id ou nome + endereço"""
+    url = business.get('url_maps') or ''
+    if url:
+        return place_id_from_url(url) or url.split('?')[0]
+    if business.get('place_id'):
+        return business['place_id']
+    return f"{business.get('nome', '')}|{business.get('endereco', '')}".lower()
+
+
+# Estado de cada processo worker
+_worker_tool: Optional[GoogleMapsSearchTool] = None
+_last_search = None
+_search_lock = None
+_min_interval = 0.0
+
+
+def _polite_wait():
+    """Espera o intervalo mínimo global desde a última busca de qualquer worker"""
+    with _search_lock:  # type: ignore[union-attr]
+        wait = _last_search.value + _min_interval - time.time()  # type: ignore[union-attr]
+        if wait > 0:
+            time.sleep(wait)
+        _last_search.value = time.time()  # type: ignore[union-attr]
+
+
+def _init_worker(last_search, search_lock, min_interval: float):
+    """Prepara um processo worker: um navegador próprio e o ritmo global compartilhado"""
+    global _last_search, _search_lock, _min_interval
+    _last_search, _search_lock, _min_interval = last_search, search_lock, min_interval
+
+    Config.WEBDRIVER_POOL_SIZE = 1
+    google_maps_tool.scraping_throttle = _polite_wait
+
+    # Workers terminam sem rodar atexit; o Finalize fecha o navegador na saída
+    multiprocessing.util.Finalize(None, _close_worker, exitpriority=10)
+
+
+def _close_worker():
+    """Fecha o navegador do worker"""
+    from tools.webdriver_pool import get_driver_pool
+    get_driver_pool().close()
+
+
+def _run_job(job: ScrapingJob) -> List[Dict]:
+    """Executa uma busca de scraping no navegador do worker"""
+    global _worker_tool
+    if _worker_tool is None:
+        _worker_tool = GoogleMapsSearchTool()
+    return _worker_tool._search_with_scraping(job.search_term, job.location, job.max_results)
+
+
+class ScrapingOrchestrator:
+    """
+    Executa buscas de scraping em paralelo, em vários processos
+
+    Cada processo worker mantém o seu próprio navegador (pool de tamanho 1)
+    e processa as buscas que recebe em sequência. Um intervalo mínimo entre
+    buscas (Config.SEARCH_DELAY) é respeitado globalmente, somando todos os
+    workers, via um valor e um lock compartilhados. Os resultados são
+    deduplicados pelo link do estabelecimento no Maps.
+    
+    Os workers são iniciados com "spawn" (processos novos, não cópias do
+    processo atual), para que não herdem os navegadores, threads e conexões
+    SQLite já abertos aqui. Por isso, scripts que usam o orquestrador
+    precisam do bloco if __name__ == "__main__".
+
+    Uso:
+        jobs = [ScrapingJob("dentista", "Campinas, SP"), ScrapingJob("padaria", "Campinas, SP")]
+        leads = ScrapingOrchestrator(workers=4).run(jobs)
+    """
+
+    def __init__(self, workers: Optional[int] = None, min_interval: Optional[float] = None,
+                 lead_writer: Optional[LeadWriteBehindQueue] = None):
+        """
+        Args:
+            workers: Número de processos (padrão: Config.SCRAPING_WORKERS)
+            min_interval: Segundos entre buscas, somando todos os workers
+                (padrão: Config.SEARCH_DELAY)
+            lead_writer: Fila opcional de gravação dos estabelecimentos encontrados
+        """
+        self.workers = workers or Config.SCRAPING_WORKERS
+        self.min_interval = Config.SEARCH_DELAY if min_interval is None else min_interval
+        self.lead_writer = lead_writer
+
+    def iter_results(self, jobs: Iterable[ScrapingJob]) -> Iterator[Dict]:
+        """
+        Executa as buscas e entrega cada estabelecimento novo assim que sua busca termina
+
+        Yields:
+            Estabelecimentos, sem repetição, com termo_busca e localizacao_busca
+        """
+        context = multiprocessing.get_context('spawn')
+        last_search = context.Value('d', 0.0, lock=False)
+        search_lock = context.Lock()
+        seen = set()
+
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                 initializer=_init_worker,
+                                 initargs=(last_search, search_lock, self.min_interval)) as executor:
+            futures = {executor.submit(_run_job, job): job for job in jobs}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    businesses = future.result()
+                except Exception as e:
+                    print(f"Erro no scraping de '{job.search_term}' em {job.location}: {e}")
+                    continue
+
+                for business in businesses:
+                    key = place_key(business)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    business = {**business, 'termo_busca': job.search_term,
+                                'localizacao_busca': job.rotulo or job.location}
+                    if self.lead_writer:
+                        self.lead_writer.submit(business)
+                    yield business
+
+    def run(self, jobs: Iterable[ScrapingJob]) -> List[Dict]:
+        """Executa as buscas e retorna todos os estabelecimentos encontrados"""
+        return list(self.iter_results(jobs))
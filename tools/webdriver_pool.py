@@ -0,0 +1,289 @@
+import atexit
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from config import Config
+
+
+# Recursos que a extração de texto não usa: imagens, mídia, fontes e os
+# blocos (tiles) do mapa
+LEAN_BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.mp4", "*.webm", "*.mp3",
+    "*/maps/vt*", "*/kh/v=*", "*/maps/api/js/StaticMapService*",
+    "*fonts.gstatic.com*", "*lh3.googleusercontent.com*", "*lh5.googleusercontent.com*",
+    "*streetviewpixels-pa.googleapis.com*",
+]
+
+# Preferências de conteúdo do perfil enxuto (2 = bloquear)
+LEAN_CONTENT_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.managed_default_content_settings.media_stream": 2,
+    "profile.default_content_setting_values.notifications": 2,
+    "profile.default_content_setting_values.geolocation": 2,
+    "profile.managed_default_content_settings.plugins": 2,
+}
+
+# Recursos do Chrome desnecessários para o scraping
+LEAN_ARGUMENTS = [
+    "--blink-settings=imagesEnabled=false",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--mute-audio",
+    "--no-first-run",
+    "--disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication",
+]
+
+
+def apply_lean_profile(driver: webdriver.Chrome):
+    """
+    Bloqueia, via DevTools, as requisições de LEAN_BLOCKED_URLS na aba atual
+
+    O bloqueio vale por aba: abas novas precisam chamar esta função de novo.
+    """
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_BLOCKED_URLS})
+
+
+def create_chrome_driver(lean: Optional[bool] = None, performance_log: Optional[bool] = None) -> webdriver.Chrome:
+    """
+    Abre um Chrome configurado para o scraping do Google Maps
+
+    Args:
+        lean: Usa o perfil enxuto, sem imagens, fontes, mídia e tiles do mapa
+            (padrão: Config.LEAN_BROWSER_PROFILE)
+        performance_log: Habilita o log "performance" com os eventos de rede
+            (padrão: ativo no modo de extração "network")
+    """
+    if lean is None:
+        lean = Config.LEAN_BROWSER_PROFILE
+    if performance_log is None:
+        performance_log = Config.SCRAPING_EXTRACTION_MODE == "network"
+
+    chrome_options = Options()
+    if Config.HEADLESS_MODE:
+        chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+    if lean:
+        for argument in LEAN_ARGUMENTS:
+            chrome_options.add_argument(argument)
+        chrome_options.add_experimental_option("prefs", LEAN_CONTENT_PREFS)
+    if performance_log:
+        # Eventos de rede no log "performance", lidos por SearchResponseCapture
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+    driver = webdriver.Chrome(options=chrome_options)
+    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    if lean:
+        apply_lean_profile(driver)
+    return driver
+
+
+class _PooledDriver:
+    """Driver do pool com os dados usados para decidir sua reciclagem"""
+
+    def __init__(self, driver: webdriver.Chrome):
+        self.driver = driver
+        self.created_at = time.monotonic()
+        self.uses = 0
+
+
+class WebDriverPool:
+    """
+    Pool de navegadores reaproveitados entre buscas
+
+    Abrir o Chrome leva alguns segundos, mais do que muitas buscas curtas.
+    O pool mantém até `size` navegadores abertos, entrega um por vez via
+    acquire() e, na devolução, limpa o estado (abas extras, cookies, página
+    atual). Navegadores que travaram, que passaram de max_uses usos ou de
+    max_age segundos são fechados e substituídos.
+    """
+
+    def __init__(self, size: int = 2, max_uses: int = 50, max_age: float = 1800,
+                 factory: Callable[[], webdriver.Chrome] = create_chrome_driver):
+        """
+        Args:
+            size: Máximo de navegadores abertos ao mesmo tempo
+            max_uses: Usos antes de reciclar um navegador
+            max_age: Idade máxima de um navegador, em segundos
+            factory: Função que cria um novo driver
+        """
+        self.size = size
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self.factory = factory
+        self._idle: List[_PooledDriver] = []
+        self._cond = threading.Condition()
+        self._total = 0
+        self._closed = False
+
+    def prewarm(self, count: Optional[int] = None, background: bool = False):
+        """
+        Abre navegadores antecipadamente
+
+        Args:
+            count: Quantos abrir (padrão: o tamanho do pool)
+            background: Abre em uma thread, sem bloquear quem chamou
+        """
+        if background:
+            threading.Thread(target=self.prewarm, args=(count,), name="webdriver-prewarm", daemon=True).start()
+            return
+
+        for _ in range(min(count or self.size, self.size)):
+            with self._cond:
+                if self._closed or self._total >= self.size:
+                    return
+                self._total += 1
+            try:
+                pooled = self._create()
+            except Exception as e:
+                print(f"Erro ao abrir navegador: {e}")
+                return
+            self._put(pooled)
+
+    def _create(self) -> _PooledDriver:
+        """Abre um navegador numa vaga já reservada em _total"""
+        try:
+            return _PooledDriver(self.factory())
+        except Exception:
+            self._free_slot()
+            raise
+
+    def _free_slot(self):
+        """Libera uma vaga do pool e acorda quem está esperando"""
+        with self._cond:
+            self._total -= 1
+            self._cond.notify()
+
+    def _put(self, pooled: _PooledDriver):
+        """Coloca um navegador na lista de ociosos"""
+        with self._cond:
+            self._idle.append(pooled)
+            self._cond.notify()
+
+    def _discard(self, pooled: _PooledDriver):
+        """Fecha um navegador e libera sua vaga no pool"""
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            print(f"Erro ao fechar navegador: {e}")
+        self._free_slot()
+
+    def _is_healthy(self, pooled: _PooledDriver) -> bool:
+        """Verifica se o navegador ainda responde e não passou dos limites de uso"""
+        if pooled.uses >= self.max_uses or time.monotonic() - pooled.created_at > self.max_age:
+            return False
+        try:
+            return pooled.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _reset(self, pooled: _PooledDriver):
+        """Deixa o navegador limpo para o próximo uso"""
+        driver = pooled.driver
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.delete_all_cookies()
+        driver.get("about:blank")
+
+    def _checkout(self, timeout: Optional[float]) -> _PooledDriver:
+        """Obtém um navegador saudável, abrindo um novo se houver vaga"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            pooled: Optional[_PooledDriver] = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Pool de navegadores já foi fechado")
+                    if self._idle:
+                        pooled = self._idle.pop()
+                        break
+                    if self._total < self.size:
+                        self._total += 1
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("Nenhum navegador disponível no pool")
+                    self._cond.wait(remaining)
+
+            if pooled is None:
+                return self._create()
+            if self._is_healthy(pooled):
+                return pooled
+            self._discard(pooled)
+
+    @contextmanager
+    def acquire(self, timeout: Optional[float] = None) -> Iterator[webdriver.Chrome]:
+        """
+        Empresta um navegador do pool
+
+        Uso:
+            with pool.acquire() as driver:
+                driver.get(url)
+
+        Args:
+            timeout: Tempo máximo de espera por um navegador livre (None = sem limite)
+        """
+        if self._closed:
+            raise RuntimeError("Pool de navegadores já foi fechado")
+
+        pooled = self._checkout(timeout)
+        pooled.uses += 1
+        try:
+            yield pooled.driver
+        finally:
+            self._release(pooled)
+
+    def _release(self, pooled: _PooledDriver):
+        """Devolve o navegador ao pool, limpando-o ou reciclando-o"""
+        if self._closed or not self._is_healthy(pooled):
+            self._discard(pooled)
+            return
+        try:
+            self._reset(pooled)
+        except Exception as e:
+            print(f"Erro ao limpar navegador, reciclando: {e}")
+            self._discard(pooled)
+            return
+        self._put(pooled)
+
+    def close(self):
+        """Fecha todos os navegadores ociosos; os emprestados são fechados na devolução"""
+        with self._cond:
+            self._closed = True
+            drivers, self._idle = self._idle, []
+            self._cond.notify_all()
+        for pooled in drivers:
+            self._discard(pooled)
+
+
+_driver_pool: Optional[WebDriverPool] = None
+_driver_pool_lock = threading.Lock()
+
+
+def get_driver_pool() -> WebDriverPool:
+    """Retorna o pool de navegadores do processo, fechado automaticamente na saída"""
+    global _driver_pool
+    with _driver_pool_lock:
+        if _driver_pool is None:
+            _driver_pool = WebDriverPool(
+                size=Config.WEBDRIVER_POOL_SIZE,
+                max_uses=Config.WEBDRIVER_MAX_USES,
+                max_age=Config.WEBDRIVER_MAX_AGE
+            )
+            atexit.register(_driver_pool.close)
+        return _driver_pool
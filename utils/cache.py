@@ -0,0 +1,171 @@
+import json
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, Optional
+from utils.database import SQLiteConnectionManager
+
+_CACHE_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS api_cache (
+        namespace TEXT NOT NULL,
+        chave TEXT NOT NULL,
+        valor TEXT NOT NULL,
+        criado_em REAL NOT NULL,
+        acessado_em REAL NOT NULL,
+        PRIMARY KEY (namespace, chave)
+    ) WITHOUT ROWID
+'''
+_CACHE_INDEX = '''
+    CREATE INDEX IF NOT EXISTS idx_api_cache_acesso ON api_cache(namespace, acessado_em)
+'''
+
+_CACHE_GET_SQL = 'SELECT valor, criado_em FROM api_cache WHERE namespace = ? AND chave = ?'
+_CACHE_TOUCH_SQL = 'UPDATE api_cache SET acessado_em = ? WHERE namespace = ? AND chave = ?'
+_CACHE_SET_SQL = '''
+    INSERT INTO api_cache (namespace, chave, valor, criado_em, acessado_em)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(namespace, chave) DO UPDATE SET
+        valor = excluded.valor,
+        criado_em = excluded.criado_em,
+        acessado_em = excluded.acessado_em
+'''
+_CACHE_DELETE_SQL = 'DELETE FROM api_cache WHERE namespace = ? AND chave = ?'
+_CACHE_COUNT_SQL = 'SELECT COUNT(*) FROM api_cache WHERE namespace = ?'
+_CACHE_EVICT_SQL = '''
+    DELETE FROM api_cache WHERE namespace = ? AND chave IN (
+        SELECT chave FROM api_cache WHERE namespace = ?
+        ORDER BY acessado_em LIMIT ?
+    )
+'''
+
+
+def normalize_key(text: str) -> str:
+    """
+    Normaliza uma chave textual: sem acentos, minúsculas e espaços simples
+
+    Exemplo: "São Paulo,  SP" -> "sao paulo, sp"
+    """
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return ' '.join(text.lower().split())
+
+
+class PersistentCache:
+    """
+    Cache chave/valor em disco (SQLite), com TTL e despejo LRU
+
+    As entradas ficam na tabela api_cache, separadas por namespace, e são
+    compartilhadas por todos os processos que apontam para o mesmo arquivo.
+    Os valores são serializados em JSON.
+    """
+
+    # Quantas gravações entre verificações do limite de entradas
+    EVICT_CHECK_INTERVAL = 100
+
+    def __init__(self, namespace: str, db_path: str = "leads.db", ttl: Optional[float] = None,
+                 max_entries: Optional[int] = None):
+        """
+        Args:
+            namespace: Nome lógico do cache (ex: "geocode")
+            db_path: Arquivo SQLite onde as entradas são guardadas
+            ttl: Validade padrão das entradas em segundos (None = sem expiração)
+            max_entries: Máximo de entradas no namespace (None = sem limite)
+        """
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.connections = SQLiteConnectionManager(db_path)
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        with self.connections.transaction() as cursor:
+            cursor.execute(_CACHE_SCHEMA)
+            cursor.execute(_CACHE_INDEX)
+
+    def close(self):
+        """Fecha as conexões com o banco do cache"""
+        self.connections.close_all()
+
+    def get(self, key: str, ttl: Optional[float] = None) -> Optional[Any]:
+        """
+        Busca um valor no cache
+
+        Args:
+            key: Chave da entrada
+            ttl: Validade em segundos para esta leitura (padrão: self.ttl)
+
+        Returns:
+            Valor armazenado, ou None se ausente ou expirado
+        """
+        ttl = self.ttl if ttl is None else ttl
+        now = time.time()
+        conn = self.connections.get_connection()
+        try:
+            row = conn.execute(_CACHE_GET_SQL, (self.namespace, key)).fetchone()
+            if row is None or (ttl is not None and now - row[1] > ttl):
+                self._count(hit=False)
+                return None
+            conn.execute(_CACHE_TOUCH_SQL, (now, self.namespace, key))
+            self._count(hit=True)
+            return json.loads(row[0])
+        except Exception as e:
+            # O cache nunca deve derrubar a busca: falha vira miss
+            print(f"Erro ao ler cache {self.namespace}: {e}")
+            self._count(hit=False)
+            return None
+
+    def set(self, key: str, value: Any):
+        """Grava (ou substitui) uma entrada no cache"""
+        now = time.time()
+        try:
+            with self.connections.transaction() as cursor:
+                cursor.execute(_CACHE_SET_SQL, (self.namespace, key, json.dumps(value, ensure_ascii=False), now, now))
+            with self._lock:
+                self._writes += 1
+                check = self._writes % self.EVICT_CHECK_INTERVAL == 1
+            if check:
+                self.evict()
+        except Exception as e:
+            print(f"Erro ao gravar cache {self.namespace}: {e}")
+
+    def delete(self, key: str):
+        """Remove uma entrada do cache"""
+        with self.connections.transaction() as cursor:
+            cursor.execute(_CACHE_DELETE_SQL, (self.namespace, key))
+
+    def evict(self) -> int:
+        """
+        Remove as entradas menos usadas recentemente além de max_entries
+
+        Returns:
+            Número de entradas removidas
+        """
+        if not self.max_entries:
+            return 0
+        with self.connections.transaction() as cursor:
+            total = cursor.execute(_CACHE_COUNT_SQL, (self.namespace,)).fetchone()[0]
+            excess = total - self.max_entries
+            if excess <= 0:
+                return 0
+            cursor.execute(_CACHE_EVICT_SQL, (self.namespace, self.namespace, excess))
+            return excess
+
+    def _count(self, hit: bool):
+        """Atualiza os contadores de acertos/faltas"""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna acertos, faltas e taxa de acerto desde a criação do objeto"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
@@ -1,21 +1,615 @@
+import atexit
+import math
+import queue
 import sqlite3
-import pandas as pd
-from datetime import datetime
-from typing import List, Dict, Optional
-import os
+import threading
+import time
+import weakref
+import numpy as np
+from collections import namedtuple
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, List, Dict, Optional, Tuple
+import re
+from urllib.parse import urlparse
+from utils.exporters import export_rows
+
+# Colunas gravadas a partir do dicionário do lead, na ordem dos parâmetros.
+# place_id e chave_contato ficam por último: são lidas por posição na tupla.
+_LEAD_COLUMNS = (
+    'nome', 'endereco', 'telefone', 'email', 'website', 'categoria',
+    'avaliacao', 'numero_avaliacoes', 'horario_funcionamento',
+    'latitude', 'longitude', 'termo_busca', 'localizacao_busca', 'observacoes',
+    'descricao', 'cnpj', 'ano_fundacao', 'campanha_id', 'place_id', 'chave_contato'
+)
+
+# Colunas adicionadas depois da primeira versão do schema; bancos antigos
+# recebem estas colunas via ALTER TABLE na inicialização
+_MIGRATED_COLUMNS = {
+    'place_id': 'TEXT',
+    'chave_contato': 'TEXT',
+    'data_atualizacao': 'TIMESTAMP',
+    'descricao': 'TEXT',
+    'cnpj': 'TEXT',
+    'ano_fundacao': 'INTEGER',
+    # Campanha em que o lead foi capturado pela primeira vez
+    'campanha_id': 'INTEGER REFERENCES campanhas(id) ON DELETE SET NULL',
+}
+
+_MIGRATED_CAMPAIGN_COLUMNS = {
+    'total_leads': 'INTEGER NOT NULL DEFAULT 0',
+    'data_ultimo_lead': 'TIMESTAMP',
+}
+
+# Campos mesclados quando uma captura repetida traz valores mais recentes.
+# Termo e localização de busca registram a captura original e não mudam.
+_MERGE_TEXT_COLUMNS = (
+    'nome', 'endereco', 'telefone', 'email', 'website', 'categoria',
+    'horario_funcionamento', 'observacoes', 'descricao', 'cnpj'
+)
+_MERGE_NUMERIC_COLUMNS = ('avaliacao', 'numero_avaliacoes', 'latitude', 'longitude', 'ano_fundacao')
+
+
+def _build_upsert_sql() -> str:
+    """Monta o INSERT ... ON CONFLICT DO UPDATE usado para deduplicar leads"""
+    merges = [f"COALESCE(NULLIF(excluded.{col}, ''), leads.{col})" for col in _MERGE_TEXT_COLUMNS]
+    merges += [f"COALESCE(NULLIF(excluded.{col}, 0), leads.{col})" for col in _MERGE_NUMERIC_COLUMNS]
+    columns = _MERGE_TEXT_COLUMNS + _MERGE_NUMERIC_COLUMNS
+
+    assignments = ",\n            ".join(f"{col} = {expr}" for col, expr in zip(columns, merges))
+    # Só reescreve a linha quando algum campo realmente mudou
+    changed = "\n            OR ".join(f"{expr} IS NOT leads.{col}" for col, expr in zip(columns, merges))
+    update = f'''DO UPDATE SET
+            {assignments},
+            chave_contato = COALESCE(leads.chave_contato, excluded.chave_contato),
+            campanha_id = COALESCE(leads.campanha_id, excluded.campanha_id),
+            data_atualizacao = CURRENT_TIMESTAMP
+        WHERE {changed}'''
+
+    placeholders = ", ".join("?" for _ in _LEAD_COLUMNS)
+    return f'''
+    INSERT INTO leads ({", ".join(_LEAD_COLUMNS)}, data_atualizacao)
+    VALUES ({placeholders}, CURRENT_TIMESTAMP)
+    ON CONFLICT(place_id) {update}
+    ON CONFLICT(chave_contato) WHERE place_id IS NULL {update}
+'''
+
+
+# SQL mantido em constantes para que o cache de statements do sqlite3
+# (indexado pelo texto do comando) reaproveite os comandos preparados
+_UPSERT_LEAD_SQL = _build_upsert_sql()
+_UPSERT_LEAD_RETURNING_SQL = _UPSERT_LEAD_SQL.rstrip() + " RETURNING id"
+
+_CAMPAIGN_POS = _LEAD_COLUMNS.index('campanha_id')
+
+_SELECT_MAX_LEAD_ID_SQL = "SELECT COALESCE(MAX(id), 0) FROM leads"
+_SELECT_LEAD_IDS_AFTER_SQL = "SELECT id FROM leads WHERE id > ? ORDER BY id"
+_SELECT_ID_BY_PLACE_ID_SQL = "SELECT id FROM leads WHERE place_id = ?"
+_SELECT_ID_BY_CONTACT_KEY_SQL = "SELECT id FROM leads WHERE chave_contato = ? AND place_id IS NULL"
+
+# Limite conservador de parâmetros por cláusula IN
+_MAX_SQL_PARAMS = 900
+
+# Índices secundários usados por ordenação e filtros frequentes
+_LEAD_INDEXES = {
+    'idx_leads_data_captura': 'leads(data_captura, id)',
+    'idx_leads_termo_busca': 'leads(termo_busca)',
+    'idx_leads_categoria': 'leads(categoria)',
+    'idx_leads_localizacao_busca': 'leads(localizacao_busca)',
+    'idx_leads_cnpj': 'leads(cnpj)',
+    'idx_leads_campanha_id': 'leads(campanha_id)',
+}
+
+# Vínculo N:N entre leads e campanhas; os contadores de cada campanha são
+# mantidos por triggers para que painéis não precisem agregar a tabela leads.
+# data_captura repete a do lead (preenchida por trigger) para que o índice
+# (campanha_id, data_captura, lead_id) entregue os leads de uma campanha já
+# na ordem da paginação de iter_leads, sem ordenar a campanha inteira
+_CAMPAIGN_SCHEMA = (
+    '''
+    CREATE TABLE IF NOT EXISTS lead_campanhas (
+        campanha_id INTEGER NOT NULL REFERENCES campanhas(id) ON DELETE CASCADE,
+        lead_id INTEGER NOT NULL REFERENCES leads(id) ON DELETE CASCADE,
+        data_vinculo TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        data_captura TIMESTAMP,
+        PRIMARY KEY (campanha_id, lead_id)
+    ) WITHOUT ROWID
+    ''',
+    "CREATE INDEX IF NOT EXISTS idx_lead_campanhas_lead ON lead_campanhas(lead_id)",
+    "CREATE INDEX IF NOT EXISTS idx_lead_campanhas_captura "
+    "ON lead_campanhas(campanha_id, data_captura, lead_id)",
+    '''
+    CREATE TRIGGER IF NOT EXISTS lead_campanhas_captura AFTER INSERT ON lead_campanhas
+    WHEN new.data_captura IS NULL BEGIN
+        UPDATE lead_campanhas
+        SET data_captura = (SELECT data_captura FROM leads WHERE id = new.lead_id)
+        WHERE campanha_id = new.campanha_id AND lead_id = new.lead_id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS lead_campanhas_ai AFTER INSERT ON lead_campanhas BEGIN
+        UPDATE campanhas
+        SET total_leads = total_leads + 1, data_ultimo_lead = CURRENT_TIMESTAMP
+        WHERE id = new.campanha_id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS lead_campanhas_ad AFTER DELETE ON lead_campanhas BEGIN
+        UPDATE campanhas SET total_leads = total_leads - 1 WHERE id = old.campanha_id;
+    END
+    ''',
+)
+
+_LINK_CAMPAIGN_SQL = "INSERT OR IGNORE INTO lead_campanhas (campanha_id, lead_id) VALUES (?, ?)"
+
+# Dados de enriquecimento normalizados em tabelas filhas
+_ENRICHMENT_SCHEMA = (
+    '''
+    CREATE TABLE IF NOT EXISTS lead_emails (
+        lead_id INTEGER NOT NULL REFERENCES leads(id) ON DELETE CASCADE,
+        email TEXT NOT NULL,
+        PRIMARY KEY (lead_id, email)
+    ) WITHOUT ROWID
+    ''',
+    "CREATE INDEX IF NOT EXISTS idx_lead_emails_email ON lead_emails(email)",
+    '''
+    CREATE TABLE IF NOT EXISTS lead_phones (
+        lead_id INTEGER NOT NULL REFERENCES leads(id) ON DELETE CASCADE,
+        telefone_normalizado TEXT NOT NULL,
+        telefone TEXT,
+        PRIMARY KEY (lead_id, telefone_normalizado)
+    ) WITHOUT ROWID
+    ''',
+    "CREATE INDEX IF NOT EXISTS idx_lead_phones_telefone ON lead_phones(telefone_normalizado)",
+    '''
+    CREATE TABLE IF NOT EXISTS lead_social (
+        lead_id INTEGER NOT NULL REFERENCES leads(id) ON DELETE CASCADE,
+        rede TEXT NOT NULL,
+        url TEXT NOT NULL,
+        PRIMARY KEY (lead_id, rede)
+    ) WITHOUT ROWID
+    ''',
+    "CREATE INDEX IF NOT EXISTS idx_lead_social_rede ON lead_social(rede, lead_id)",
+)
+
+_INSERT_EMAIL_SQL = "INSERT OR IGNORE INTO lead_emails (lead_id, email) VALUES (?, ?)"
+_INSERT_PHONE_SQL = (
+    "INSERT OR IGNORE INTO lead_phones (lead_id, telefone_normalizado, telefone) VALUES (?, ?, ?)"
+)
+_UPSERT_SOCIAL_SQL = '''
+    INSERT INTO lead_social (lead_id, rede, url) VALUES (?, ?, ?)
+    ON CONFLICT(lead_id, rede) DO UPDATE SET url = excluded.url WHERE url IS NOT excluded.url
+'''
+_UPDATE_LEAD_ENRICHMENT_SQL = '''
+    UPDATE leads SET
+        email = COALESCE(NULLIF(?, ''), email),
+        descricao = COALESCE(NULLIF(?, ''), descricao),
+        cnpj = COALESCE(?, cnpj),
+        ano_fundacao = COALESCE(?, ano_fundacao),
+        data_atualizacao = CURRENT_TIMESTAMP
+    WHERE id = ?
+'''
+
+# Índice de texto completo (FTS5) sincronizado com a tabela leads por triggers
+_FTS_COLUMNS = ('nome', 'endereco', 'categoria', 'descricao')
+_FTS_NEW_VALUES = ", ".join(f"new.{col}" for col in _FTS_COLUMNS)
+_FTS_OLD_VALUES = ", ".join(f"old.{col}" for col in _FTS_COLUMNS)
+_FTS_SCHEMA = (
+    f'''
+    CREATE VIRTUAL TABLE IF NOT EXISTS leads_fts USING fts5(
+        {", ".join(_FTS_COLUMNS)},
+        content='leads', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS leads_fts_ai AFTER INSERT ON leads BEGIN
+        INSERT INTO leads_fts(rowid, {", ".join(_FTS_COLUMNS)})
+        VALUES (new.id, {_FTS_NEW_VALUES});
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS leads_fts_ad AFTER DELETE ON leads BEGIN
+        INSERT INTO leads_fts(leads_fts, rowid, {", ".join(_FTS_COLUMNS)})
+        VALUES ('delete', old.id, {_FTS_OLD_VALUES});
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS leads_fts_au AFTER UPDATE OF {", ".join(_FTS_COLUMNS)} ON leads BEGIN
+        INSERT INTO leads_fts(leads_fts, rowid, {", ".join(_FTS_COLUMNS)})
+        VALUES ('delete', old.id, {_FTS_OLD_VALUES});
+        INSERT INTO leads_fts(rowid, {", ".join(_FTS_COLUMNS)})
+        VALUES (new.id, {_FTS_NEW_VALUES});
+    END
+    ''',
+)
+
+# Filtros aceitos pelas consultas de leads: chave -> (expressão SQL, operador)
+_LEAD_FILTERS = {
+    'termo_busca': ('leads.termo_busca', '='),
+    'termo_busca_contem': ('leads.termo_busca', 'LIKE'),
+    'localizacao_busca': ('leads.localizacao_busca', '='),
+    'categoria': ('leads.categoria', '='),
+    'avaliacao_min': ('leads.avaliacao', '>='),
+    'data_inicio': ('leads.data_captura', '>='),
+    'data_fim': ('leads.data_captura', '<='),
+}
+
+
+# Leads de uma campanha, a partir da chave primária (campanha_id, lead_id)
+_CAMPAIGN_FILTER_SQL = "leads.id IN (SELECT lead_id FROM lead_campanhas WHERE campanha_id = ?)"
+_HAS_EMAIL_SQL = "EXISTS (SELECT 1 FROM lead_emails e WHERE e.lead_id = leads.id)"
+
+# Filtros resolvidos por subconsulta: chave -> função (valor) -> (condição, parâmetros).
+# Subconsultas "id IN (...)" partem do índice da tabela filha em vez de varrer leads.
+_SPECIAL_FILTERS = {
+    'campanha_id': lambda value: (_CAMPAIGN_FILTER_SQL, [value]),
+    'cnpj': lambda value: ("leads.cnpj = ?", [normalize_cnpj(value)]),
+    'tem_email': lambda value: (_HAS_EMAIL_SQL if value else f"NOT {_HAS_EMAIL_SQL}", []),
+    'rede_social': lambda value: (
+        "leads.id IN (SELECT lead_id FROM lead_social WHERE rede = ?)",
+        [str(value).lower()]
+    ),
+    'telefone': lambda value: (
+        "leads.id IN (SELECT lead_id FROM lead_phones WHERE telefone_normalizado = ?)",
+        [normalize_phone(value)]
+    ),
+}
+
+
+def _build_filters(filters: Optional[Dict]) -> Tuple[List[str], List]:
+    """
+    Converte um dicionário de filtros em condições SQL parametrizadas
+
+    Valores em lista/tupla/conjunto viram cláusulas IN. Chaves desconhecidas
+    geram ValueError em vez de serem ignoradas silenciosamente.
+    """
+    conditions: List[str] = []
+    params: List = []
+    for key, value in (filters or {}).items():
+        if value is None:
+            continue
+        if key in _SPECIAL_FILTERS:
+            condition, values = _SPECIAL_FILTERS[key](value)
+            conditions.append(condition)
+            params.extend(values)
+            continue
+        if key not in _LEAD_FILTERS:
+            raise ValueError(f"Filtro de leads desconhecido: {key}")
+        column, operator = _LEAD_FILTERS[key]
+        if isinstance(value, (list, tuple, set)):
+            values = list(value)
+            placeholders = ", ".join("?" for _ in values)
+            conditions.append(f"{column} IN ({placeholders})")
+            params.extend(values)
+        elif operator == 'LIKE':
+            conditions.append(f"{column} LIKE ?")
+            params.append(f"%{value}%")
+        else:
+            conditions.append(f"{column} {operator} ?")
+            params.append(value)
+    return conditions, params
+
+
+def _fts_query(text: str) -> str:
+    """Converte texto livre em uma consulta FTS5 segura (termos com prefixo, em AND)"""
+    terms = re.findall(r'\w+', text or '')
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+# Índice espacial R*Tree: um retângulo degenerado (ponto) por lead com
+# coordenadas válidas; (0, 0) é o valor padrão de leads sem localização
+_RTREE_VALID_POINT = (
+    "{row}.latitude IS NOT NULL AND {row}.longitude IS NOT NULL "
+    "AND NOT ({row}.latitude = 0 AND {row}.longitude = 0)"
+)
+_RTREE_SCHEMA = (
+    '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS leads_rtree USING rtree(
+        id, min_lat, max_lat, min_lng, max_lng
+    )
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS leads_rtree_ai AFTER INSERT ON leads
+    WHEN {_RTREE_VALID_POINT.format(row="new")} BEGIN
+        INSERT INTO leads_rtree VALUES (new.id, new.latitude, new.latitude, new.longitude, new.longitude);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS leads_rtree_ad AFTER DELETE ON leads BEGIN
+        DELETE FROM leads_rtree WHERE id = old.id;
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS leads_rtree_au AFTER UPDATE OF latitude, longitude ON leads BEGIN
+        DELETE FROM leads_rtree WHERE id = old.id;
+        INSERT INTO leads_rtree
+        SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude
+        WHERE {_RTREE_VALID_POINT.format(row="new")};
+    END
+    ''',
+)
+
+# Raio médio da Terra (IUGG), em metros
+EARTH_RADIUS_M = 6371008.8
+
+
+def haversine_m(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Distância em metros de um ponto até vários pontos (vetorizada com NumPy)"""
+    lat1, lng1 = np.radians(lat), np.radians(lng)
+    lat2, lng2 = np.radians(lats), np.radians(lngs)
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def bounding_box(lat: float, lng: float, radius_m: float) -> Tuple[float, float, float, float]:
+    """
+    Retângulo (min_lat, min_lng, max_lat, max_lng) que contém o círculo dado
+
+    Não trata a travessia do antimeridiano, irrelevante para as regiões
+    atendidas pelo sistema.
+    """
+    dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+    cos_lat = max(math.cos(math.radians(lat)), 1e-12)
+    dlng = min(math.degrees(radius_m / (EARTH_RADIUS_M * cos_lat)), 180.0)
+    return (max(lat - dlat, -90.0), max(lng - dlng, -180.0),
+            min(lat + dlat, 90.0), min(lng + dlng, 180.0))
+
+
+def normalize_phone(phone: Optional[str]) -> str:
+    """
+    Normaliza um telefone para comparação, mantendo apenas os dígitos
+
+    Remove o código do país (55) e o zero de longa distância, de modo que
+    "+55 (11) 99999-9999" e "011 99999-9999" resultem na mesma chave.
+    """
+    digits = re.sub(r'\D', '', phone or '')
+    if len(digits) > 11 and digits.startswith('55'):
+        digits = digits[2:]
+    return digits.lstrip('0')
+
+
+def normalize_website(website: Optional[str]) -> str:
+    """Normaliza um website para comparação (sem esquema, www, query e barra final)"""
+    website = (website or '').strip().lower()
+    if not website:
+        return ''
+    if '://' not in website:
+        website = 'http://' + website
+    parsed = urlparse(website)
+    host = parsed.netloc
+    if host.startswith('www.'):
+        host = host[4:]
+    return (host + parsed.path).rstrip('/')
+
+
+def normalize_cnpj(cnpj: Optional[str]) -> Optional[str]:
+    """Mantém apenas os 14 dígitos do CNPJ (None se inválido)"""
+    digits = re.sub(r'\D', '', cnpj or '')
+    return digits if len(digits) == 14 else None
+
+
+def _to_year(value) -> Optional[int]:
+    """Converte o ano de fundação extraído do site para inteiro"""
+    try:
+        year = int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+    return year if 1800 <= year <= 2100 else None
+
+
+def enrichment_rows(lead: Dict) -> Optional[Dict]:
+    """
+    Extrai de um lead enriquecido as linhas das tabelas filhas
+
+    Returns:
+        Dicionário com 'emails', 'phones' e 'social', ou None se o lead
+        não tiver nenhum dado de contato estruturado
+    """
+    emails = {
+        email.strip().lower()
+        for email in [lead.get('email') or ''] + list(lead.get('emails_encontrados') or [])
+        if isinstance(email, str) and '@' in email
+    }
+    phones = {}
+    for phone in [lead.get('telefone') or ''] + list(lead.get('telefones_adicionais') or []):
+        normalized = normalize_phone(phone)
+        if len(normalized) >= 8:
+            phones.setdefault(normalized, phone.strip())
+    social = [
+        (str(rede).lower(), url)
+        for rede, url in (lead.get('redes_sociais') or {}).items()
+        if url
+    ]
+    if not (emails or phones or social):
+        return None
+    return {'emails': sorted(emails), 'phones': list(phones.items()), 'social': social}
+
+
+def contact_key(lead: Dict) -> Optional[str]:
+    """
+    Chave secundária de deduplicação para leads sem place_id
+
+    Usa o telefone normalizado e, na falta dele, o website normalizado.
+    """
+    phone = normalize_phone(lead.get('telefone'))
+    if len(phone) >= 8:
+        return f"tel:{phone}"
+    website = normalize_website(lead.get('website'))
+    if website:
+        return f"web:{website}"
+    return None
+
+
+class SQLiteConnectionManager:
+    """
+    Gerencia conexões SQLite persistentes e seguras entre threads.
+
+    Cada thread recebe sua própria conexão de longa duração, configurada com
+    journaling WAL para que leitores (dashboard) e escritores (crew) não se
+    bloqueiem mutuamente. A conexão é fechada quando a sua thread termina,
+    de modo que threads de curta duração (reexecuções do Streamlit, pools
+    de threads criados por busca) não acumulam conexões abertas.
+    """
+
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA cache_size=-20000",  # ~20MB de cache de páginas
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA mmap_size=268435456",  # 256MB
+        "PRAGMA foreign_keys=ON",
+    )
+
+    def __init__(self, db_path: str, timeout: float = 30.0, cached_statements: int = 256):
+        self.db_path = db_path
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        # Bancos em memória só existem dentro da conexão que os criou: todas
+        # as threads usam a mesma, com uma transação por vez
+        self._shared: Optional[sqlite3.Connection] = None
+        self._shared_lock = threading.RLock()
+        self._in_memory = db_path == ":memory:"
+        # Fecha as conexões restantes se o gerenciador for descartado sem close_all()
+        weakref.finalize(self, _close_connections, self._connections, self._lock)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre uma nova conexão e aplica os PRAGMAs de desempenho"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            isolation_level=None,  # transações controladas explicitamente
+            check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    def get_connection(self) -> sqlite3.Connection:
+        """Retorna a conexão persistente da thread atual"""
+        if self._in_memory:
+            with self._lock:
+                if self._shared is None:
+                    self._shared = sqlite3.connect(
+                        self.db_path,
+                        isolation_level=None,
+                        check_same_thread=False,
+                        cached_statements=self.cached_statements
+                    )
+                    self._connections.append(self._shared)
+            return self._shared
+
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            # Sem referência ao gerenciador, que pode ser descartado antes da thread
+            weakref.finalize(threading.current_thread(), _release_connection,
+                             self._connections, self._lock, conn)
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Cursor]:
+        """
+        Executa um bloco dentro de uma transação de escrita
+
+        Se já houver uma transação aberta na conexão da thread, o bloco
+        participa dela em vez de abrir outra. Na conexão compartilhada dos
+        bancos em memória, transações de threads diferentes esperam a vez.
+        """
+        if self._in_memory:
+            with self._shared_lock, self._transaction() as cursor:
+                yield cursor
+        else:
+            with self._transaction() as cursor:
+                yield cursor
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Cursor]:
+        """Abre a transação na conexão da thread ou participa da já aberta"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        if conn.in_transaction:
+            yield cursor
+            return
+
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            yield cursor
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+        finally:
+            cursor.close()
+
+    def close_all(self):
+        """Fecha todas as conexões abertas pelo gerenciador"""
+        with self._lock:
+            self._shared = None
+        _close_connections(self._connections, self._lock)
+        self._local = threading.local()
+
+
+def _release_connection(connections: List[sqlite3.Connection], lock: threading.Lock,
+                        conn: sqlite3.Connection):
+    """Fecha a conexão de uma thread que terminou"""
+    with lock:
+        if conn not in connections:
+            return  # já fechada por close_all
+        connections.remove(conn)
+    try:
+        conn.close()
+    except sqlite3.Error as e:
+        print(f"Erro ao fechar conexão com o banco: {e}")
+
+
+def _close_connections(connections: List[sqlite3.Connection], lock: threading.Lock):
+    """Fecha e esquece todas as conexões da lista"""
+    with lock:
+        closing = list(connections)
+        connections.clear()
+    for conn in closing:
+        try:
+            conn.close()
+        except sqlite3.Error as e:
+            print(f"Erro ao fechar conexão com o banco: {e}")
+
 
 class LeadDatabase:
     """Classe para gerenciar o banco de dados de leads"""
     
     def __init__(self, db_path: str = "leads.db"):
         self.db_path = db_path
+        self.connections = SQLiteConnectionManager(db_path)
+        self.fts_enabled = False
+        self.rtree_enabled = False
         self.init_database()
     
+    def close(self):
+        """Fecha as conexões persistentes com o banco"""
+        self.connections.close_all()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
     def init_database(self):
         """Inicializa o banco de dados com as tabelas necessárias"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+        with self.connections.transaction() as cursor:
+            self._create_schema(cursor)
+    
+    def _create_schema(self, cursor: sqlite3.Cursor):
+        """Cria as tabelas do banco, caso ainda não existam"""
         # Criar tabela de leads
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS leads (
@@ -34,9 +628,34 @@ class LeadDatabase:
                 termo_busca TEXT,
                 localizacao_busca TEXT,
                 data_captura TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                observacoes TEXT
+                observacoes TEXT,
+                place_id TEXT,
+                chave_contato TEXT,
+                data_atualizacao TIMESTAMP
             )
         ''')
+        added = self._migrate_columns(cursor, 'leads', _MIGRATED_COLUMNS)
+        if 'chave_contato' in added:
+            self._backfill_contact_keys(cursor)
+        
+        # Chaves de deduplicação: place_id do Google e, para leads sem ele
+        # (ex.: web scraping), telefone/website normalizados
+        cursor.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_leads_place_id ON leads(place_id)"
+        )
+        cursor.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_leads_chave_contato "
+            "ON leads(chave_contato) WHERE place_id IS NULL"
+        )
+        
+        for index_name, target in _LEAD_INDEXES.items():
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {target}")
+        
+        self.fts_enabled = self._create_fts(cursor)
+        self.rtree_enabled = self._create_rtree(cursor)
+        
+        for statement in _ENRICHMENT_SCHEMA:
+            cursor.execute(statement)
         
         # Criar tabela de campanhas
         cursor.execute('''
@@ -49,30 +668,425 @@ class LeadDatabase:
                 status TEXT DEFAULT 'ativa'
             )
         ''')
+        self._migrate_columns(cursor, 'campanhas', _MIGRATED_CAMPAIGN_COLUMNS)
+        self._create_campaign_links(cursor)
+    
+    def _create_campaign_links(self, cursor: sqlite3.Cursor):
+        """Cria o vínculo lead–campanha, migrando leads de campanhas antigas"""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'lead_campanhas'")
+        already_exists = cursor.fetchone() is not None
+        if already_exists and self._migrate_columns(cursor, 'lead_campanhas', {'data_captura': 'TIMESTAMP'}):
+            cursor.execute(
+                "UPDATE lead_campanhas SET data_captura = "
+                "(SELECT data_captura FROM leads WHERE id = lead_campanhas.lead_id)"
+            )
+        for statement in _CAMPAIGN_SCHEMA:
+            cursor.execute(statement)
         
-        conn.commit()
-        conn.close()
+        if not already_exists:
+            # Antes do vínculo explícito, um lead pertencia à campanha que
+            # tinha o mesmo termo e localização de busca
+            cursor.execute('''
+                INSERT OR IGNORE INTO lead_campanhas (campanha_id, lead_id)
+                SELECT c.id, l.id FROM campanhas c
+                JOIN leads l ON l.termo_busca = c.termo_busca AND l.localizacao_busca = c.localizacao
+            ''')
     
-    def save_lead(self, lead: Dict) -> Optional[int]:
+    def _create_fts(self, cursor: sqlite3.Cursor) -> bool:
+        """
+        Cria o índice FTS5 de leads e os triggers que o mantêm sincronizado
+        
+        Returns:
+            False se o SQLite em uso não tiver suporte a FTS5
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'leads_fts'")
+        already_exists = cursor.fetchone() is not None
+        try:
+            for statement in _FTS_SCHEMA:
+                cursor.execute(statement)
+        except sqlite3.OperationalError as e:
+            print(f"FTS5 indisponível, busca textual usará LIKE: {e}")
+            return False
+        
+        if not already_exists:
+            # Indexa leads gravados antes da criação do índice
+            cursor.execute("INSERT INTO leads_fts(leads_fts) VALUES ('rebuild')")
+        return True
+    
+    def _create_rtree(self, cursor: sqlite3.Cursor) -> bool:
+        """
+        Cria o índice espacial R*Tree de leads e os triggers de sincronização
+        
+        Returns:
+            False se o SQLite em uso não tiver o módulo R*Tree
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'leads_rtree'")
+        already_exists = cursor.fetchone() is not None
+        try:
+            for statement in _RTREE_SCHEMA:
+                cursor.execute(statement)
+        except sqlite3.OperationalError as e:
+            print(f"R*Tree indisponível, consultas por área farão varredura: {e}")
+            return False
+        
+        if not already_exists:
+            cursor.execute(
+                "INSERT INTO leads_rtree "
+                "SELECT id, latitude, latitude, longitude, longitude FROM leads "
+                f"WHERE {_RTREE_VALID_POINT.format(row='leads')}"
+            )
+        return True
+    
+    def _migrate_columns(self, cursor: sqlite3.Cursor, table: str, columns: Dict[str, str]) -> List[str]:
+        """
+        Adiciona a bancos existentes as colunas criadas em versões posteriores
+        
+        Returns:
+            Colunas adicionadas agora
+        """
+        cursor.execute(f"PRAGMA table_info({table})")
+        existing = {row[1] for row in cursor.fetchall()}
+        added = []
+        for column, column_type in columns.items():
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+                added.append(column)
+        return added
+    
+    def _backfill_contact_keys(self, cursor: sqlite3.Cursor):
+        """
+        Preenche chave_contato dos leads gravados antes da deduplicação
+        
+        Sem isso, a primeira captura após a atualização duplicaria todo lead
+        antigo sem place_id. Quando leads antigos já repetem a mesma chave,
+        só o mais recente a recebe (o índice único não admite repetição); os
+        demais ficam sem chave, como estavam.
+        """
+        cursor.execute(
+            "SELECT chave_contato FROM leads WHERE chave_contato IS NOT NULL AND place_id IS NULL"
+        )
+        used = {row[0] for row in cursor.fetchall()}
+        cursor.execute(
+            "SELECT id, telefone, website FROM leads "
+            "WHERE chave_contato IS NULL AND place_id IS NULL ORDER BY id DESC"
+        )
+        updates = []
+        for lead_id, telefone, website in cursor.fetchall():
+            key = contact_key({'telefone': telefone, 'website': website})
+            if key and key not in used:
+                used.add(key)
+                updates.append((key, lead_id))
+        cursor.executemany("UPDATE leads SET chave_contato = ? WHERE id = ?", updates)
+    
+    def create_campaign(self, nome: str, termo_busca: str = '', localizacao: str = '') -> Optional[int]:
+        """
+        Cria uma campanha de captura
+        
+        Returns:
+            ID da campanha criada
+        """
+        with self.connections.transaction() as cursor:
+            cursor.execute(
+                "INSERT INTO campanhas (nome, termo_busca, localizacao) VALUES (?, ?, ?)",
+                (nome, termo_busca, localizacao)
+            )
+            return cursor.lastrowid
+    
+    def get_campaign(self, campaign_id: int) -> Optional[Dict]:
+        """Recupera uma campanha com seus contadores (total_leads, data_ultimo_lead)"""
+        cursor = self.connections.get_connection().cursor()
+        try:
+            cursor.execute("SELECT * FROM campanhas WHERE id = ?", (campaign_id,))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            columns = [description[0] for description in cursor.description]
+            return dict(zip(columns, row))
+        finally:
+            cursor.close()
+    
+    def link_leads_to_campaign(self, campaign_id: int, lead_ids: Iterable[int]):
+        """Associa leads existentes a uma campanha (vínculos repetidos são ignorados)"""
+        with self.connections.transaction() as cursor:
+            cursor.executemany(_LINK_CAMPAIGN_SQL, [
+                (campaign_id, lead_id) for lead_id in lead_ids if lead_id
+            ])
+    
+    def save_lead(self, lead: Dict, campaign_id: Optional[int] = None) -> Optional[int]:
         """
         Salva um lead no banco de dados
         
+        Leads já existentes (mesmo place_id ou, sem place_id, mesmo telefone
+        ou website normalizado) são atualizados com os campos mais recentes
+        em vez de duplicados.
+        
         Args:
             lead: Dicionário com dados do lead
+            campaign_id: Campanha à qual o lead será vinculado (padrão:
+                lead['campanha_id'], se houver)
         
         Returns:
             ID do lead salvo
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self.connections.transaction() as cursor:
+            row = self._lead_to_row(lead, campaign_id)
+            lead_id = self._upsert_row(cursor, row)
+            enrichment = enrichment_rows(lead)
+            if lead_id and enrichment:
+                self._write_enrichment_rows(cursor, [(lead_id, enrichment)])
+            if lead_id and row[_CAMPAIGN_POS]:
+                cursor.execute(_LINK_CAMPAIGN_SQL, (row[_CAMPAIGN_POS], lead_id))
         
-        cursor.execute('''
-            INSERT INTO leads (
-                nome, endereco, telefone, email, website, categoria,
-                avaliacao, numero_avaliacoes, horario_funcionamento,
-                latitude, longitude, termo_busca, localizacao_busca, observacoes
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        return lead_id
+    
+    def _upsert_row(self, cursor: sqlite3.Cursor, row: tuple) -> Optional[int]:
+        """Grava uma linha via upsert e retorna o ID do lead inserido ou existente"""
+        cursor.execute(_UPSERT_LEAD_RETURNING_SQL, row)
+        returned = cursor.fetchone()
+        if returned:
+            return returned[0]
+        # Nenhuma linha retornada: o lead já existia e não havia o que atualizar
+        return self._lookup_lead_id(cursor, row)
+    
+    def _lookup_lead_id(self, cursor: sqlite3.Cursor, row: tuple) -> Optional[int]:
+        """Localiza o ID de um lead existente pelas chaves de deduplicação"""
+        place_id, chave = row[-2], row[-1]
+        if place_id:
+            cursor.execute(_SELECT_ID_BY_PLACE_ID_SQL, (place_id,))
+        elif chave:
+            cursor.execute(_SELECT_ID_BY_CONTACT_KEY_SQL, (chave,))
+        else:
+            return None
+        found = cursor.fetchone()
+        return found[0] if found else None
+    
+    def save_leads(self, leads: Iterable[Dict], batch_size: int = 500,
+                   campaign_id: Optional[int] = None) -> Dict:
+        """
+        Salva vários leads em lote, com uma transação por lote
+        
+        Os leads são consumidos do iterável sob demanda, então geradores
+        podem ser usados sem materializar toda a captura em memória.
+        
+        Args:
+            leads: Iterável de dicionários com dados dos leads
+            batch_size: Quantidade de leads gravados por transação
+            campaign_id: Campanha à qual os leads serão vinculados
+        
+        Returns:
+            Dicionário com 'ids' (IDs inseridos, na ordem de entrada) e
+            'falhas' (lista com 'indice' e 'erro' dos leads rejeitados).
+            Leads que atualizaram um registro existente retornam o ID dele.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size deve ser maior que zero")
+        
+        resultado: Dict = {'ids': [], 'falhas': []}
+        batch: List[Tuple[int, tuple]] = []
+        enrichments: Dict[int, Dict] = {}
+        
+        for indice, lead in enumerate(leads):
+            try:
+                row = self._lead_to_row(lead, campaign_id)
+                enrichment = enrichment_rows(lead)
+            except Exception as e:
+                resultado['falhas'].append({'indice': indice, 'erro': str(e)})
+                continue
+            
+            batch.append((indice, row))
+            if enrichment:
+                enrichments[indice] = enrichment
+            
+            if len(batch) >= batch_size:
+                self._insert_batch(batch, resultado, enrichments)
+                batch, enrichments = [], {}
+        
+        if batch:
+            self._insert_batch(batch, resultado, enrichments)
+        
+        return resultado
+    
+    def _insert_batch(self, batch: List[Tuple[int, tuple]], resultado: Dict,
+                      enrichments: Optional[Dict[int, Dict]] = None):
+        """Grava um lote com executemany, isolando linhas com erro se necessário"""
+        with self.connections.transaction() as cursor:
+            saved = self._upsert_batch(cursor, batch, resultado)
+            resultado['ids'].extend(lead_id for _, lead_id in saved)
+            
+            if enrichments:
+                self._write_enrichment_rows(cursor, [
+                    (lead_id, enrichments[indice])
+                    for indice, lead_id in saved
+                    if lead_id and indice in enrichments
+                ])
+            
+            campaigns = {indice: row[_CAMPAIGN_POS] for indice, row in batch if row[_CAMPAIGN_POS]}
+            if campaigns:
+                cursor.executemany(_LINK_CAMPAIGN_SQL, [
+                    (campaigns[indice], lead_id)
+                    for indice, lead_id in saved
+                    if lead_id and indice in campaigns
+                ])
+    
+    def _upsert_batch(self, cursor: sqlite3.Cursor, batch: List[Tuple[int, tuple]],
+                      resultado: Dict) -> List[Tuple[int, Optional[int]]]:
+        """
+        Executa o upsert de um lote dentro da transação corrente
+        
+        Returns:
+            Pares (índice de entrada, ID gravado) das linhas bem-sucedidas;
+            as falhas são registradas em resultado['falhas']
+        """
+        # A transação é IMMEDIATE: nenhum outro escritor insere entre
+        # a leitura do último ID e o executemany
+        cursor.execute(_SELECT_MAX_LEAD_ID_SQL)
+        ultimo_id = cursor.fetchone()[0]
+        
+        cursor.execute("SAVEPOINT lote_leads")
+        try:
+            cursor.executemany(_UPSERT_LEAD_SQL, [row for _, row in batch])
+        except sqlite3.Error:
+            # Desfaz o lote parcial e grava linha a linha para
+            # descobrir quais leads falharam sem perder os demais
+            cursor.execute("ROLLBACK TO lote_leads")
+            cursor.execute("RELEASE lote_leads")
+            saved = []
+            for indice, row in batch:
+                try:
+                    saved.append((indice, self._upsert_row(cursor, row)))
+                except sqlite3.Error as e:
+                    resultado['falhas'].append({'indice': indice, 'erro': str(e)})
+            return saved
+        
+        cursor.execute("RELEASE lote_leads")
+        ids = self._resolve_batch_ids(cursor, batch, ultimo_id)
+        return [(indice, lead_id) for (indice, _), lead_id in zip(batch, ids)]
+    
+    def _resolve_batch_ids(self, cursor: sqlite3.Cursor, batch: List[Tuple[int, tuple]],
+                           ultimo_id: int) -> List[int]:
+        """
+        Descobre os IDs gravados por um executemany, na ordem do lote
+        
+        Linhas com chave de deduplicação são resolvidas por consulta nos
+        índices únicos; as demais foram necessariamente inseridas e recebem,
+        em ordem, os novos IDs não associados a nenhuma chave.
+        """
+        by_place = self._ids_by_key(cursor, "place_id", "",
+                                    {row[-2] for _, row in batch if row[-2]})
+        by_contact = self._ids_by_key(cursor, "chave_contato", " AND place_id IS NULL",
+                                      {row[-1] for _, row in batch if not row[-2] and row[-1]})
+        
+        claimed = set(by_place.values()) | set(by_contact.values())
+        cursor.execute(_SELECT_LEAD_IDS_AFTER_SQL, (ultimo_id,))
+        unkeyed_ids = iter([row[0] for row in cursor.fetchall() if row[0] not in claimed])
+        
+        ids = []
+        for _, row in batch:
+            if row[-2]:
+                ids.append(by_place[row[-2]])
+            elif row[-1]:
+                ids.append(by_contact[row[-1]])
+            else:
+                ids.append(next(unkeyed_ids))
+        return ids
+    
+    def _ids_by_key(self, cursor: sqlite3.Cursor, column: str, condition: str, keys: set) -> Dict:
+        """Mapeia valores de uma coluna de chave única para os IDs dos leads"""
+        mapping: Dict = {}
+        keys_list = list(keys)
+        for start in range(0, len(keys_list), _MAX_SQL_PARAMS):
+            chunk = keys_list[start:start + _MAX_SQL_PARAMS]
+            placeholders = ", ".join("?" for _ in chunk)
+            cursor.execute(
+                f"SELECT {column}, id FROM leads WHERE {column} IN ({placeholders}){condition}",
+                chunk
+            )
+            mapping.update(cursor.fetchall())
+        return mapping
+    
+    def save_enrichments(self, enrichments: Iterable[Tuple[int, Dict]], batch_size: int = 500) -> int:
+        """
+        Grava em lote os dados de enriquecimento de leads já existentes
+        
+        Emails, telefones e redes sociais vão para as tabelas filhas
+        (lead_emails, lead_phones, lead_social); email principal, descrição,
+        CNPJ e ano de fundação atualizam a própria linha do lead.
+        
+        Args:
+            enrichments: Iterável de pares (lead_id, dados do DataEnrichmentTool)
+            batch_size: Quantidade de leads gravados por transação
+        
+        Returns:
+            Número de leads processados
+        """
+        total = 0
+        batch: List[Tuple[int, Dict]] = []
+        for lead_id, data in enrichments:
+            batch.append((lead_id, data))
+            if len(batch) >= batch_size:
+                self._write_enrichment_batch(batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            self._write_enrichment_batch(batch)
+            total += len(batch)
+        return total
+    
+    def _write_enrichment_batch(self, batch: List[Tuple[int, Dict]]):
+        """Grava um lote de enriquecimentos em uma transação"""
+        with self.connections.transaction() as cursor:
+            cursor.executemany(_UPDATE_LEAD_ENRICHMENT_SQL, [
+                (
+                    data.get('email', ''),
+                    data.get('descricao', ''),
+                    normalize_cnpj(data.get('cnpj')),
+                    _to_year(data.get('ano_fundacao')),
+                    lead_id
+                )
+                for lead_id, data in batch
+            ])
+            rows = [(lead_id, enrichment_rows(data)) for lead_id, data in batch]
+            self._write_enrichment_rows(cursor, [(lead_id, rows) for lead_id, rows in rows if rows])
+    
+    def _write_enrichment_rows(self, cursor: sqlite3.Cursor, items: List[Tuple[int, Dict]]):
+        """Insere as linhas das tabelas filhas de enriquecimento com executemany"""
+        if not items:
+            return
+        cursor.executemany(_INSERT_EMAIL_SQL, [
+            (lead_id, email) for lead_id, rows in items for email in rows['emails']
+        ])
+        cursor.executemany(_INSERT_PHONE_SQL, [
+            (lead_id, normalized, phone) for lead_id, rows in items for normalized, phone in rows['phones']
+        ])
+        cursor.executemany(_UPSERT_SOCIAL_SQL, [
+            (lead_id, rede, url) for lead_id, rows in items for rede, url in rows['social']
+        ])
+    
+    def get_enrichment(self, lead_id: int) -> Dict:
+        """
+        Recupera os dados de enriquecimento normalizados de um lead
+        
+        Returns:
+            Dicionário com 'emails', 'telefones' e 'redes_sociais'
+        """
+        conn = self.connections.get_connection()
+        emails = [row[0] for row in conn.execute(
+            "SELECT email FROM lead_emails WHERE lead_id = ? ORDER BY email", (lead_id,))]
+        phones = [row[0] for row in conn.execute(
+            "SELECT telefone FROM lead_phones WHERE lead_id = ? ORDER BY telefone", (lead_id,))]
+        social = dict(conn.execute(
+            "SELECT rede, url FROM lead_social WHERE lead_id = ? ORDER BY rede", (lead_id,)).fetchall())
+        return {'emails': emails, 'telefones': phones, 'redes_sociais': social}
+    
+    def find_lead_by_cnpj(self, cnpj: str) -> Optional[Dict]:
+        """Localiza um lead pelo CNPJ (com ou sem pontuação), usando o índice"""
+        for lead in self.iter_leads({'cnpj': cnpj}, page_size=1):
+            return lead
+        return None
+    
+    def _lead_to_row(self, lead: Dict, campaign_id: Optional[int] = None) -> tuple:
+        """Converte o dicionário de um lead na tupla de parâmetros do INSERT"""
+        return (
             lead.get('nome', ''),
             lead.get('endereco', ''),
             lead.get('telefone', ''),
@@ -86,14 +1100,14 @@ class LeadDatabase:
             lead.get('longitude', 0.0),
             lead.get('termo_busca', ''),
             lead.get('localizacao_busca', ''),
-            lead.get('observacoes', '')
-        ))
-        
-        lead_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
-        return lead_id
+            lead.get('observacoes', ''),
+            lead.get('descricao', ''),
+            normalize_cnpj(lead.get('cnpj')),
+            _to_year(lead.get('ano_fundacao')),
+            campaign_id or lead.get('campanha_id') or None,
+            lead.get('place_id') or None,
+            contact_key(lead)
+        )
     
     def get_leads(self, limit: Optional[int] = None, campaign_id: Optional[int] = None) -> List[Dict]:
         """
@@ -106,20 +1120,254 @@ class LeadDatabase:
         Returns:
             Lista de leads
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        page_size = min(int(limit), 500) if limit else 500
+        leads = []
+        for lead in self.iter_leads({'campanha_id': campaign_id}, page_size=page_size):
+            leads.append(lead)
+            if limit and len(leads) >= limit:
+                break
+        
+        return leads
+    
+    def iter_leads(self, filters: Optional[Dict] = None, page_size: int = 500,
+                   after: Optional[Tuple[str, int]] = None, row_type: str = "dict") -> Iterator[Any]:
+        """
+        Percorre leads sob demanda, do mais recente para o mais antigo
         
-        query = "SELECT * FROM leads ORDER BY data_captura DESC"
+        Usa paginação por chave (keyset) em (data_captura, id): cada página é
+        uma consulta curta no índice, então a memória usada fica limitada ao
+        tamanho da página independentemente do total de leads.
+        
+        Args:
+            filters: Filtros aceitos por search_leads, além de campanha_id
+            page_size: Quantidade de linhas lidas por consulta
+            after: Cursor (data_captura, id) do último lead já processado;
+                a iteração continua a partir do lead seguinte
+            row_type: "dict", "tuple" ou "namedtuple"
+        
+        Yields:
+            Leads no formato escolhido em row_type
+        """
+        if page_size < 1:
+            raise ValueError("page_size deve ser maior que zero")
+        if row_type not in ("dict", "tuple", "namedtuple"):
+            raise ValueError(f"row_type inválido: {row_type}")
+        
+        # Por campanha, a paginação segue o índice (campanha_id, data_captura,
+        # lead_id) do vínculo; sem campanha, o índice (data_captura, id) de leads
+        filters = dict(filters or {})
+        campaign_id = filters.pop('campanha_id', None)
+        conditions, params = _build_filters(filters)
+        if campaign_id is None:
+            base_sql = "SELECT * FROM leads"
+            date_col, id_col = "leads.data_captura", "leads.id"
+        else:
+            base_sql = "SELECT leads.* FROM lead_campanhas lc JOIN leads ON leads.id = lc.lead_id"
+            date_col, id_col = "lc.data_captura", "lc.lead_id"
+            conditions.insert(0, "lc.campanha_id = ?")
+            params.insert(0, campaign_id)
+        
+        record = None
+        cursor_key = tuple(after) if after else None
+        conn = self.connections.get_connection()
+        
+        while True:
+            page_conditions = list(conditions)
+            page_params = list(params)
+            if cursor_key:
+                page_conditions.append(f"({date_col}, {id_col}) < (?, ?)")
+                page_params.extend(cursor_key)
+            
+            sql = base_sql
+            if page_conditions:
+                sql += " WHERE " + " AND ".join(page_conditions)
+            sql += f" ORDER BY {date_col} DESC, {id_col} DESC LIMIT ?"
+            page_params.append(page_size)
+            
+            cursor = conn.cursor()
+            try:
+                cursor.execute(sql, page_params)
+                columns = [description[0] for description in cursor.description]
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+            
+            if not rows:
+                return
+            
+            if row_type == "namedtuple" and record is None:
+                record = namedtuple("Lead", columns)
+            date_pos, id_pos = columns.index("data_captura"), columns.index("id")
+            
+            for row in rows:
+                if row_type == "dict":
+                    yield dict(zip(columns, row))
+                elif row_type == "namedtuple":
+                    yield record._make(row)
+                else:
+                    yield row
+            
+            if len(rows) < page_size:
+                return
+            cursor_key = (rows[-1][date_pos], rows[-1][id_pos])
+    
+    def search_leads(self, query: str, filters: Optional[Dict] = None, limit: int = 50) -> List[Dict]:
+        """
+        Busca textual em nome, endereço, categoria e descrição dos leads
+        
+        Args:
+            query: Texto livre; cada palavra é buscada como prefixo
+            filters: Filtros adicionais (termo_busca, localizacao_busca,
+                categoria, avaliacao_min, data_inicio, data_fim, campanha_id,
+                cnpj, telefone, rede_social, tem_email)
+            limit: Número máximo de leads a retornar
+        
+        Returns:
+            Lista de leads, dos mais relevantes para os menos relevantes
+        """
+        conditions, params = _build_filters(filters)
+        match = _fts_query(query)
+        
+        if match and self.fts_enabled:
+            sql = (
+                "SELECT leads.* FROM leads_fts "
+                "JOIN leads ON leads.id = leads_fts.rowid "
+                "WHERE leads_fts MATCH ?"
+            )
+            params.insert(0, match)
+            order = "ORDER BY bm25(leads_fts)"
+        else:
+            sql = "SELECT leads.* FROM leads WHERE 1 = 1"
+            for term in re.findall(r'\w+', query or ''):
+                conditions.append(
+                    "(leads.nome LIKE ? OR leads.endereco LIKE ? "
+                    "OR leads.categoria LIKE ? OR leads.descricao LIKE ?)"
+                )
+                params.extend([f"%{term}%"] * 4)
+            order = "ORDER BY leads.data_captura DESC, leads.id DESC"
+        
+        for condition in conditions:
+            sql += f" AND {condition}"
+        sql += f" {order} LIMIT ?"
+        params.append(int(limit))
+        
+        cursor = self.connections.get_connection().cursor()
+        try:
+            cursor.execute(sql, params)
+            columns = [description[0] for description in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+    
+    def leads_in_bbox(self, min_lat: float, min_lng: float, max_lat: float, max_lng: float,
+                      filters: Optional[Dict] = None, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Recupera leads dentro de um retângulo de coordenadas
+        
+        Args:
+            min_lat, min_lng, max_lat, max_lng: Limites do retângulo, em graus
+            filters: Filtros aceitos por iter_leads
+            limit: Número máximo de leads a retornar
+        
+        Returns:
+            Lista de leads dentro do retângulo
+        """
+        conditions, params = _build_filters(filters)
+        # Coordenadas do R*Tree são float32 arredondadas para fora: o índice
+        # pré-filtra e a comparação nas colunas REAL garante o limite exato
+        conditions.insert(0, "leads.latitude BETWEEN ? AND ? AND leads.longitude BETWEEN ? AND ?")
+        params[:0] = [min_lat, max_lat, min_lng, max_lng]
+        
+        if self.rtree_enabled:
+            sql = (
+                "SELECT leads.* FROM leads_rtree r JOIN leads ON leads.id = r.id "
+                "WHERE r.max_lat >= ? AND r.min_lat <= ? AND r.max_lng >= ? AND r.min_lng <= ?"
+            )
+            params[:0] = [min_lat, max_lat, min_lng, max_lng]
+        else:
+            sql = "SELECT leads.* FROM leads WHERE 1 = 1"
+        
+        for condition in conditions:
+            sql += f" AND {condition}"
         if limit:
-            query += f" LIMIT {limit}"
+            sql += " LIMIT ?"
+            params.append(int(limit))
         
-        cursor.execute(query)
-        columns = [description[0] for description in cursor.description]
-        leads = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        cursor = self.connections.get_connection().cursor()
+        try:
+            cursor.execute(sql, params)
+            columns = [description[0] for description in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+    
+    def leads_within(self, lat: float, lng: float, radius_m: float,
+                     filters: Optional[Dict] = None, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Recupera leads a até radius_m metros de um ponto, do mais próximo ao mais distante
         
-        conn.close()
+        O índice espacial seleciona os candidatos do retângulo que envolve o
+        círculo; a distância haversine de todos eles é calculada de uma vez
+        com NumPy para descartar os cantos do retângulo.
+        
+        Args:
+            lat, lng: Centro da busca, em graus
+            radius_m: Raio em metros
+            filters: Filtros aceitos por iter_leads
+            limit: Número máximo de leads a retornar
+        
+        Returns:
+            Lista de leads com a chave adicional 'distancia_m'
+        """
+        candidates = self.leads_in_bbox(*bounding_box(lat, lng, radius_m), filters=filters)
+        if not candidates:
+            return []
+        
+        lats = np.fromiter((lead['latitude'] for lead in candidates), dtype=float, count=len(candidates))
+        lngs = np.fromiter((lead['longitude'] for lead in candidates), dtype=float, count=len(candidates))
+        distances = haversine_m(lat, lng, lats, lngs)
+        
+        inside = np.flatnonzero(distances <= radius_m)
+        ordered = inside[np.argsort(distances[inside], kind='stable')]
+        if limit:
+            ordered = ordered[:int(limit)]
+        
+        leads = []
+        for position in ordered:
+            lead = candidates[position]
+            lead['distancia_m'] = float(distances[position])
+            leads.append(lead)
         return leads
     
+    def export(self, filename: str, filters: Optional[Dict] = None, formato: Optional[str] = None,
+               compression: Optional[str] = None, chunk_size: int = 5000) -> int:
+        """
+        Exporta leads em blocos, sem carregar a tabela inteira em memória
+        
+        Args:
+            filename: Arquivo de saída (.xlsx, .csv, .json, .jsonl ou .parquet,
+                com sufixo .gz/.zst opcional para compressão)
+            filters: Filtros aceitos por iter_leads
+            formato: Força um formato independentemente da extensão
+            compression: "gzip" ou "zstd"
+            chunk_size: Linhas lidas do banco por página
+        
+        Returns:
+            Número de leads exportados
+        """
+        cursor = self.connections.get_connection().cursor()
+        try:
+            cursor.execute("PRAGMA table_info(leads)")
+            table_info = cursor.fetchall()
+        finally:
+            cursor.close()
+        columns = [row[1] for row in table_info]
+        column_types = [row[2] for row in table_info]
+        
+        rows = self.iter_leads(filters, page_size=chunk_size, row_type="tuple")
+        return export_rows(rows, columns, filename, formato=formato, compression=compression,
+                           chunk_size=chunk_size, column_types=column_types)
+    
     def export_to_excel(self, filename: str, filter_term: Optional[str] = None) -> bool:
         """
         Exporta leads para arquivo Excel
@@ -132,27 +1380,130 @@ class LeadDatabase:
             True se exportação foi bem-sucedida
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            
-            query = "SELECT * FROM leads"
-            if filter_term:
-                query += f" WHERE termo_busca LIKE '%{filter_term}%'"
-            query += " ORDER BY data_captura DESC"
-            
-            df = pd.read_sql_query(query, conn)
-            conn.close()
-            
-            # Garantir que o diretório existe
-            os.makedirs(os.path.dirname(filename) if os.path.dirname(filename) else ".", exist_ok=True)
-            
-            # Exportar para Excel
-            df.to_excel(filename, index=False, engine='openpyxl')
+            self.export(filename, {'termo_busca_contem': filter_term}, formato='xlsx')
             return True
             
         except Exception as e:
             print(f"Erro ao exportar para Excel: {e}")
             return False
 
+class LeadWriteBehindQueue:
+    """
+    Grava leads em segundo plano, desacoplando captura e persistência
+    
+    Produtores chamam submit() e seguem trabalhando; uma thread dedicada
+    consome a fila limitada e agrupa os leads pendentes em transações via
+    LeadDatabase.save_leads. Com a fila cheia, submit() bloqueia, aplicando
+    contrapressão em vez de acumular memória sem limite.
+    """
+    
+    _STOP = object()
+    
+    def __init__(self, database: LeadDatabase, max_queue_size: int = 10000,
+                 batch_size: int = 500, max_retries: int = 3, campaign_id: Optional[int] = None):
+        self.database = database
+        self.campaign_id = campaign_id
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.saved_ids: List[Optional[int]] = []
+        self.failures: List[Dict] = []
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="lead-write-behind", daemon=True)
+        self._thread.start()
+        # Garante que leads pendentes sejam gravados na saída do processo
+        atexit.register(self.close)
+    
+    def submit(self, lead: Dict, timeout: Optional[float] = None):
+        """
+        Enfileira um lead para gravação
+        
+        Args:
+            lead: Dicionário com dados do lead
+            timeout: Tempo máximo de espera com a fila cheia (None = sem limite)
+        """
+        if self._closed:
+            raise RuntimeError("A fila de gravação já foi encerrada")
+        self._queue.put(lead, timeout=timeout)
+    
+    def submit_many(self, leads: Iterable[Dict], timeout: Optional[float] = None):
+        """Enfileira vários leads para gravação"""
+        for lead in leads:
+            self.submit(lead, timeout=timeout)
+    
+    def flush(self):
+        """Bloqueia até que todos os leads enfileirados tenham sido gravados"""
+        self._queue.join()
+    
+    def close(self, timeout: Optional[float] = None):
+        """Grava os leads pendentes e encerra a thread de gravação"""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(self._STOP)
+        self._thread.join(timeout)
+        atexit.unregister(self.close)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _run(self):
+        """Laço da thread de gravação: agrupa o que estiver na fila e grava"""
+        stop = False
+        while not stop:
+            batch = []
+            item = self._queue.get()
+            if item is self._STOP:
+                stop = True
+            else:
+                batch.append(item)
+            
+            # Aproveita tudo o que já estiver enfileirado no mesmo lote
+            while len(batch) < self.batch_size and not stop:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stop = True
+                else:
+                    batch.append(item)
+            
+            if batch:
+                self._write(batch)
+            for _ in range(len(batch) + (1 if stop else 0)):
+                self._queue.task_done()
+    
+    def _write(self, batch: List[Dict]):
+        """Grava um lote, repetindo com espera crescente se o banco estiver ocupado"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                result = self.database.save_leads(batch, batch_size=self.batch_size,
+                                                  campaign_id=self.campaign_id)
+            except sqlite3.OperationalError as e:
+                # Banco bloqueado/ocupado: tenta novamente antes de desistir
+                if attempt < self.max_retries:
+                    time.sleep(0.1 * 2 ** attempt)
+                    continue
+                error = e
+            except Exception as e:
+                error = e
+            else:
+                self.saved_ids.extend(result['ids'])
+                self.failures.extend(
+                    {'lead': batch[falha['indice']], 'erro': falha['erro']} for falha in result['falhas']
+                )
+                return
+            
+            print(f"Erro ao gravar lote de {len(batch)} leads: {error}")
+            self.failures.extend({'lead': lead, 'erro': str(error)} for lead in batch)
+            return
+
 # Função de conveniência para inicializar o banco
 def init_database(db_path: str = "leads.db"):
     """Inicializa o banco de dados"""
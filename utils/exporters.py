@@ -0,0 +1,256 @@
+import csv
+import gzip
+import io
+import json
+import os
+import re
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Extensões reconhecidas -> formato de exportação
+EXPORT_FORMATS = {
+    '.xlsx': 'xlsx',
+    '.csv': 'csv',
+    '.json': 'json',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+    '.parquet': 'parquet',
+}
+
+# Sufixos de compressão reconhecidos -> algoritmo
+COMPRESSION_SUFFIXES = {
+    '.gz': 'gzip',
+    '.zst': 'zstd',
+}
+
+
+def detect_format(filename: str, formato: Optional[str] = None,
+                  compression: Optional[str] = None) -> Tuple[str, Optional[str]]:
+    """
+    Descobre formato e compressão a partir do nome do arquivo
+
+    Exemplos: "leads.csv.gz" -> ("csv", "gzip"); "leads.xlsx" -> ("xlsx", None).
+    Valores passados explicitamente têm precedência sobre a extensão.
+    """
+    base, ext = os.path.splitext(filename.lower())
+    if ext in COMPRESSION_SUFFIXES:
+        compression = compression or COMPRESSION_SUFFIXES[ext]
+        base, ext = os.path.splitext(base)
+
+    formato = formato or EXPORT_FORMATS.get(ext)
+    if formato not in EXPORT_FORMATS.values():
+        raise ValueError(f"Formato de exportação não suportado: {formato or ext}")
+    if compression not in (None, 'gzip', 'zstd'):
+        raise ValueError(f"Compressão não suportada: {compression}")
+    if formato == 'xlsx' and compression:
+        raise ValueError("Arquivos Excel já são compactados; use compressão apenas com CSV/JSON/Parquet")
+    return formato, compression
+
+
+def _open_text(filename: str, compression: Optional[str]) -> io.TextIOBase:
+    """Abre um arquivo texto para escrita, com compressão opcional"""
+    if compression == 'gzip':
+        return gzip.open(filename, 'wt', encoding='utf-8', newline='')  # type: ignore[return-value]
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("Compressão zstd requer o pacote 'zstandard' (pip install zstandard)")
+        raw = open(filename, 'wb')
+        stream = zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+        return io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    return open(filename, 'w', encoding='utf-8', newline='')
+
+
+def _json_value(value):
+    """Converte valores não serializáveis (ex.: bytes) para JSON"""
+    if isinstance(value, bytes):
+        return value.decode('utf-8', errors='replace')
+    return value
+
+
+def _write_xlsx(rows: Iterable[Sequence], columns: List[str], filename: str, **_) -> int:
+    """Escreve em Excel no modo write-only do openpyxl (linhas vão direto para o disco)"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title="Leads")
+    sheet.append(columns)
+    count = 0
+    for row in rows:
+        sheet.append(list(row))
+        count += 1
+    workbook.save(filename)
+    return count
+
+
+def _write_csv(rows: Iterable[Sequence], columns: List[str], filename: str,
+               compression: Optional[str] = None, **_) -> int:
+    """Escreve CSV incrementalmente"""
+    count = 0
+    with _open_text(filename, compression) as stream:
+        writer = csv.writer(stream)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def _write_jsonl(rows: Iterable[Sequence], columns: List[str], filename: str,
+                 compression: Optional[str] = None, **_) -> int:
+    """Escreve um objeto JSON por linha"""
+    count = 0
+    with _open_text(filename, compression) as stream:
+        for row in rows:
+            record = {col: _json_value(value) for col, value in zip(columns, row)}
+            stream.write(json.dumps(record, ensure_ascii=False))
+            stream.write("\n")
+            count += 1
+    return count
+
+
+def _write_json(rows: Iterable[Sequence], columns: List[str], filename: str,
+                compression: Optional[str] = None, **_) -> int:
+    """Escreve um array JSON sem montar a lista completa em memória"""
+    count = 0
+    with _open_text(filename, compression) as stream:
+        stream.write("[")
+        for row in rows:
+            record = {col: _json_value(value) for col, value in zip(columns, row)}
+            stream.write(",\n  " if count else "\n  ")
+            stream.write(json.dumps(record, ensure_ascii=False))
+            count += 1
+        stream.write("\n]\n" if count else "]\n")
+    return count
+
+
+def _chunks(rows: Iterable[Sequence], size: int) -> Iterator[List[Sequence]]:
+    """Agrupa linhas em blocos de tamanho fixo"""
+    chunk: List[Sequence] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _arrow_type(pa, declared_type: Optional[str]):
+    """Mapeia o tipo declarado de uma coluna SQLite para um tipo Arrow"""
+    declared_type = (declared_type or '').upper()
+    if 'INT' in declared_type:
+        return pa.int64()
+    if any(token in declared_type for token in ('REAL', 'FLOA', 'DOUB')):
+        return pa.float64()
+    return pa.string()
+
+
+def _to_int(value) -> Optional[int]:
+    """Inteiro de um valor numérico ou texto legado (ex.: "1.234", "(1,234)")"""
+    if value is None or isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value)
+    digits = re.sub(r'\D', '', value.decode('utf-8', errors='replace') if isinstance(value, bytes) else str(value))
+    return int(digits) if digits else None
+
+
+def _to_float(value) -> Optional[float]:
+    """Número real de um valor numérico ou texto legado (ex.: "4,6"); None se não for número"""
+    if value is None or isinstance(value, float):
+        return value
+    if isinstance(value, int):
+        return float(value)
+    text = value.decode('utf-8', errors='replace') if isinstance(value, bytes) else str(value)
+    try:
+        return float(text.strip().replace(',', '.'))
+    except ValueError:
+        return None
+
+
+def _to_str(value) -> Optional[str]:
+    """Texto de qualquer valor"""
+    if value is None or isinstance(value, str):
+        return value
+    return _json_value(value) if isinstance(value, bytes) else str(value)
+
+
+def _arrow_converter(pa, arrow_type):
+    """Conversão aplicada aos valores de uma coluna antes de montar o bloco Arrow"""
+    if arrow_type == pa.int64():
+        return _to_int
+    if arrow_type == pa.float64():
+        return _to_float
+    return _to_str
+
+
+def _write_parquet(rows: Iterable[Sequence], columns: List[str], filename: str,
+                   compression: Optional[str] = None, chunk_size: int = 5000,
+                   column_types: Optional[List[str]] = None, **_) -> int:
+    """Escreve Parquet com um row group por bloco de linhas"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Exportação Parquet requer o pacote 'pyarrow' (pip install pyarrow)")
+
+    # Schema fixo definido antes da primeira linha: blocos com colunas
+    # totalmente nulas não podem mudar o tipo entre row groups
+    types = column_types or [None] * len(columns)
+    schema = pa.schema([(col, _arrow_type(pa, decl)) for col, decl in zip(columns, types)])
+    # O SQLite não impõe os tipos declarados: linhas antigas do scraping têm,
+    # por exemplo, avaliações em texto ("4,6"), convertidas aqui para o schema
+    converters = [_arrow_converter(pa, field.type) for field in schema]
+
+    count = 0
+    with pq.ParquetWriter(filename, schema, compression=compression or 'snappy') as writer:
+        for chunk in _chunks(rows, chunk_size):
+            table = pa.Table.from_pydict(
+                {col: [convert(row[i]) for row in chunk]
+                 for i, (col, convert) in enumerate(zip(columns, converters))},
+                schema=schema
+            )
+            writer.write_table(table)
+            count += len(chunk)
+    return count
+
+
+_WRITERS = {
+    'xlsx': _write_xlsx,
+    'csv': _write_csv,
+    'json': _write_json,
+    'jsonl': _write_jsonl,
+    'parquet': _write_parquet,
+}
+
+
+def export_rows(rows: Iterable[Sequence], columns: List[str], filename: str,
+                formato: Optional[str] = None, compression: Optional[str] = None,
+                chunk_size: int = 5000, column_types: Optional[List[str]] = None) -> int:
+    """
+    Exporta linhas para arquivo em memória constante
+
+    As linhas são consumidas do iterável à medida que são escritas, então
+    a exportação pode ser alimentada diretamente por um cursor do banco.
+
+    Args:
+        rows: Iterável de tuplas na ordem de columns
+        columns: Nomes das colunas
+        filename: Arquivo de saída; a extensão define o formato (.xlsx, .csv,
+            .json, .jsonl, .parquet) e um sufixo .gz/.zst a compressão
+        formato: Força um formato independentemente da extensão
+        compression: "gzip" ou "zstd" (Parquet usa o codec internamente)
+        chunk_size: Linhas por row group (Parquet)
+        column_types: Tipos SQL declarados das colunas, usados no schema Parquet
+
+    Returns:
+        Número de linhas exportadas
+    """
+    formato, compression = detect_format(filename, formato, compression)
+
+    # Garantir que o diretório existe
+    os.makedirs(os.path.dirname(filename) if os.path.dirname(filename) else ".", exist_ok=True)
+
+    return _WRITERS[formato](rows, columns, filename, compression=compression,
+                             chunk_size=chunk_size, column_types=column_types)
@@ -0,0 +1,69 @@
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Limitador de taxa token bucket, seguro entre threads
+
+    Os tokens são repostos continuamente à taxa configurada (requisições
+    por segundo) até a capacidade do balde, que define o maior pico
+    permitido. Cada chamada de acquire() consome um token, esperando
+    pela reposição quando o balde está vazio.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate deve ser maior que zero")
+        self._rate = float(rate)
+        self._capacity = float(capacity) if capacity else max(1.0, self._rate)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        """Taxa atual, em tokens por segundo"""
+        return self._rate
+
+    def set_rate(self, rate: float):
+        """Altera a taxa de reposição (ex.: para reduzir o ritmo após erros de cota)"""
+        if rate <= 0:
+            raise ValueError("rate deve ser maior que zero")
+        with self._lock:
+            self._refill()
+            self._rate = float(rate)
+
+    def _refill(self):
+        """Repõe os tokens acumulados desde a última atualização (requer o lock)"""
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """
+        Consome tokens, bloqueando até que estejam disponíveis
+
+        Args:
+            tokens: Quantidade de tokens a consumir
+            timeout: Tempo máximo de espera em segundos (None = sem limite)
+
+        Returns:
+            True se os tokens foram obtidos, False se o timeout expirou
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self._rate
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
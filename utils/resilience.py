@@ -0,0 +1,146 @@
+import random
+import threading
+import time
+from typing import Any, Callable, Optional
+
+
+class CircuitOpenError(Exception):
+    """Chamada recusada porque o circuito está aberto (serviço considerado indisponível)"""
+
+
+def backoff_delay(attempt: int, base_delay: float = 0.5, max_delay: float = 30.0) -> float:
+    """
+    Espera antes da tentativa seguinte: exponencial com jitter completo
+
+    Um valor aleatório entre 0 e base_delay * 2^attempt (limitado a
+    max_delay), para que clientes que falharam juntos não voltem juntos.
+    """
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def call_with_retry(func: Callable[..., Any], *args,
+                    retries: int = 4,
+                    base_delay: float = 0.5,
+                    max_delay: float = 30.0,
+                    is_retryable: Callable[[Exception], bool] = lambda e: True,
+                    on_retry: Optional[Callable[[Exception, int], None]] = None,
+                    **kwargs) -> Any:
+    """
+    Executa uma função, repetindo-a em erros transitórios
+
+    Args:
+        func: Função a executar
+        retries: Número máximo de novas tentativas
+        base_delay: Espera base em segundos (dobra a cada tentativa)
+        max_delay: Espera máxima entre tentativas
+        is_retryable: Diz se um erro merece nova tentativa
+        on_retry: Chamada a cada erro repetido, com o erro e o número da tentativa
+
+    Returns:
+        O retorno de func
+
+    Raises:
+        O último erro, se as tentativas acabarem ou o erro não for transitório
+    """
+    attempt = 0
+    while True:
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            if attempt >= retries or not is_retryable(e):
+                raise
+            if on_retry:
+                on_retry(e, attempt)
+            time.sleep(backoff_delay(attempt, base_delay, max_delay))
+            attempt += 1
+
+
+class CircuitBreaker:
+    """
+    Disjuntor para chamadas a um serviço externo
+
+    Após failure_threshold falhas seguidas o circuito abre e as chamadas
+    passam a ser recusadas imediatamente (CircuitOpenError), sem esperar
+    por timeouts. Passados reset_timeout segundos, uma chamada de teste é
+    liberada (meio-aberto): se der certo o circuito fecha, senão reabre.
+    """
+
+    CLOSED = 'fechado'
+    OPEN = 'aberto'
+    HALF_OPEN = 'meio-aberto'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0,
+                 is_failure: Callable[[Exception], bool] = lambda e: True):
+        """
+        Args:
+            failure_threshold: Falhas seguidas que abrem o circuito
+            reset_timeout: Segundos com o circuito aberto antes da chamada de teste
+            is_failure: Diz se um erro conta como indisponibilidade do serviço
+                (erros de uso, como parâmetros inválidos, não devem contar)
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.is_failure = is_failure
+        self._failures = 0
+        self._opened_at = 0.0
+        self._state = self.CLOSED
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Estado atual: fechado, aberto ou meio-aberto"""
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """True enquanto as chamadas estão sendo recusadas"""
+        return self.state == self.OPEN
+
+    def allow(self) -> bool:
+        """Diz se uma chamada pode prosseguir (no meio-aberto, só a de teste)"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        """Registra uma chamada bem-sucedida, fechando o circuito"""
+        with self._lock:
+            self._failures = 0
+            self._state = self.CLOSED
+
+    def record_failure(self):
+        """Registra uma falha, abrindo o circuito ao atingir o limite"""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Executa func através do disjuntor"""
+        if not self.allow():
+            raise CircuitOpenError("Serviço temporariamente indisponível (circuito aberto)")
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            if self.is_failure(e):
+                self.record_failure()
+            else:
+                # Erro de uso: não diz nada sobre a saúde do serviço
+                self._release_probe()
+            raise
+        self.record_success()
+        return result
+
+    def _release_probe(self):
+        """Devolve a chamada de teste sem conclusão: a próxima chamada testa de novo"""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._state = self.OPEN